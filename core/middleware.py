@@ -5,7 +5,7 @@ from django.contrib import messages
 from django.contrib.auth import logout
 from django.conf import settings
 from django.contrib.sessions.exceptions import SessionInterrupted
-from .utils import get_user_locations
+from .utils import get_user_locations, get_user_location_ids
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +36,23 @@ class SessionErrorMiddleware:
             return self.get_response(request)
 
 
+class LocationContextMiddleware:
+    """Expose the user's locations as request.user_locations / request.user_location_ids.
+
+    Both are resolved here, through the memoized core.utils helpers, rather
+    than wrapped in SimpleLazyObject: a lazy tuple passes isinstance(tuple)
+    checks, so Django rebuilds it with type(value)(...) when it is used in an
+    ``__in`` filter, which fails.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user_locations = get_user_locations(request.user)
+        request.user_location_ids = get_user_location_ids(request.user)
+        return self.get_response(request)
+
+
 class LocationAccessMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -26,12 +26,12 @@ class Location(models.Model):
 
 
 class UserProfile(models.Model):
-    ROLE_CHOICES = [
+    ROLE_CHOICES = (
         ('admin', 'Administrator'),
         ('manager', 'Manager'),
         ('staff', 'Staff'),
         ('cashier', 'Cashier'),
-    ]
+    )
     
     user = models.OneToOneField(
         User, 
@@ -1,11 +1,13 @@
 # core/signals.py
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in
 from django.contrib.auth import logout
-from .models import UserProfile
+from django.core.cache import cache
+from .models import Location, UserProfile
+from .utils import get_user_locations_cache_key, clear_all_user_locations_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,16 @@ def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'profile'):
         instance.profile.save()
 
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_profile_locations(sender, instance, **kwargs):
+    """Role and assigned location decide a user's locations, so drop their cached set"""
+    cache.delete(get_user_locations_cache_key(instance.user_id))
+
+@receiver([post_save, post_delete], sender=Location)
+def invalidate_all_user_locations(sender, **kwargs):
+    """Admins see every location, so any location change expires all cached sets"""
+    clear_all_user_locations_cache()
+
 # COMMENTED OUT - Login verification is now handled by CustomLoginView
 # @receiver(user_logged_in)
 # def require_verification_on_login(sender, request, user, **kwargs):
@@ -6,24 +6,41 @@ from functools import wraps
 import logging
 
 # core/utils.py
+from django.db import connections
 from django.db.models import Q
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from functools import wraps
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+USER_LOCATIONS_VERSION_KEY = "user_locations_version"
+
+def get_user_locations_cache_key(user_id):
+    """Cache key for a user's locations; the shared version expires every user at once"""
+    version = cache.get_or_set(USER_LOCATIONS_VERSION_KEY, 1, None)
+    return f"user_locations_{version}_{user_id}"
+
 def get_user_locations(user):
     """Get locations accessible by the user"""
     if not user.is_authenticated:
         from inventory.models import Location  # Changed from core.models
         return Location.objects.none()
     
-    cache_key = f"user_locations_{user.id}"
+    # request.user is loaded once per request, so memoizing on the instance
+    # collapses repeated calls within a request without going stale
+    memoized = getattr(user, '_user_locations', None)
+    if memoized is not None:
+        return memoized
+    
+    cache_key = get_user_locations_cache_key(user.id)
     cached_locations = cache.get(cache_key)
     
     if cached_locations is not None:
+        user._user_locations = cached_locations
         return cached_locations
     
     try:
@@ -50,6 +67,7 @@ def get_user_locations(user):
         
         # Cache for 5 minutes
         cache.set(cache_key, locations, 300)
+        user._user_locations = locations
         return locations
         
     except Exception as e:
@@ -67,27 +85,99 @@ def get_user_default_location(user):
     return None
 
 def can_user_access_location(user, location):
-    """Check if user can access a specific location"""
-    user_locations = get_user_locations(user)
-    return location in user_locations
-
-def filter_queryset_by_user_locations(queryset, user, location_field='location'):
-    """Filter any queryset by user's accessible locations"""
-    user_locations = get_user_locations(user)
-    if user_locations.exists():
-        filter_kwargs = {f'{location_field}__in': user_locations}
+    """Check if user can access a specific location (instance or id)"""
+    # Checks the memoized id tuple instead of iterating Location instances
+    if location is None:
+        return False
+    location_id = getattr(location, 'pk', location)
+    return location_id in get_user_location_ids(user)
+
+def filter_queryset_by_user_locations(queryset, user, location_field='location', location_ids=None):
+    """Filter any queryset by user's accessible locations
+
+    Pass ``location_ids`` (e.g. request.user_location_ids) when the caller
+    already has them.
+    """
+    # Filtering on literal ids emits IN (1, 2, 3) rather than a subquery
+    # and skips the separate exists() round-trip
+    if location_ids is None:
+        location_ids = get_user_location_ids(user)
+    if location_ids:
+        filter_kwargs = {f'{location_field}__in': location_ids}
         return queryset.filter(**filter_kwargs)
     return queryset.none()
 
 def get_user_location_ids(user):
-    """Get list of location IDs accessible by user"""
-    locations = get_user_locations(user)
-    return list(locations.values_list('id', flat=True))
+    """Get tuple of location IDs accessible by user"""
+    memoized = getattr(user, '_user_location_ids', None)
+    if memoized is not None:
+        return memoized
+    
+    # Iterating reuses the rows already fetched when the locations were
+    # cached, where values_list() would issue a fresh query
+    location_ids = tuple(location.id for location in get_user_locations(user))
+    if user.is_authenticated:
+        user._user_location_ids = location_ids
+    return location_ids
 
 def clear_user_locations_cache(user):
     """Clear cache for user locations (call when user permissions change)"""
-    cache_key = f"user_locations_{user.id}"
-    cache.delete(cache_key)
+    cache.delete(get_user_locations_cache_key(user.id))
+    if hasattr(user, '_user_locations'):
+        del user._user_locations
+    if hasattr(user, '_user_location_ids'):
+        del user._user_location_ids
+
+def clear_all_user_locations_cache():
+    """Clear cached locations for every user (call when locations change)"""
+    try:
+        cache.incr(USER_LOCATIONS_VERSION_KEY)
+    except ValueError:
+        cache.set(USER_LOCATIONS_VERSION_KEY, 1, None)
+
+DASHBOARD_STATS_VERSION_KEY = "dashboard_stats_version"
+DASHBOARD_STATS_TIMEOUT = 60
+
+def get_dashboard_stats_cache_key(user):
+    """Cache key for a user's dashboard totals, scoped to their location set"""
+    # Bumping the version orphans every cached entry at once, since the
+    # default LocMem backend cannot delete keys by pattern
+    version = cache.get_or_set(DASHBOARD_STATS_VERSION_KEY, 1, None)
+    location_ids = ",".join(str(pk) for pk in sorted(get_user_location_ids(user)))
+    location_hash = hashlib.md5(location_ids.encode()).hexdigest()
+    return f"dashboard_stats_{version}_{user.id}_{location_hash}"
+
+def clear_dashboard_stats_cache():
+    """Invalidate cached dashboard totals (call when sales or purchases change)"""
+    try:
+        cache.incr(DASHBOARD_STATS_VERSION_KEY)
+    except ValueError:
+        cache.set(DASHBOARD_STATS_VERSION_KEY, 1, None)
+
+def approx_count(queryset, threshold=10000):
+    """Count rows for KPI displays, using the planner's estimate on large PostgreSQL tables"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    
+    # Small result sets are cheap to count exactly, and estimates are
+    # least reliable there
+    if estimate < threshold:
+        return queryset.count()
+    return estimate
+
+def prefers_minimal_response(request):
+    """Check if the client sent ``Prefer: return=minimal`` (RFC 7240)"""
+    preferences = request.headers.get('Prefer', '')
+    return 'return=minimal' in (preference.strip() for preference in preferences.split(','))
 
 # Additional utility functions for enhanced functionality
 
@@ -13,7 +13,7 @@ from django.core.mail import send_mail
 
 from .models import Location, UserProfile, LoginVerification
 from .forms import CustomUserCreationForm, CustomUserChangeForm, UserProfileForm
-from .utils import get_user_locations, can_user_access_location
+from .utils import get_user_locations, can_user_access_location, prefers_minimal_response
 
 from allauth.account.views import LoginView as AllauthLoginView
 
@@ -156,6 +156,8 @@ def location_create_api(request):
     if not name:
         return JsonResponse({'ok': False, 'error': 'name required'}, status=400)
     loc = Location.objects.create(name=name, address=address)
+    if prefers_minimal_response(request):
+        return JsonResponse({'ok': True, 'id': loc.id}, status=201)
     return JsonResponse({'ok': True, 'id': loc.id, 'name': loc.name})
 
 # User Management Views
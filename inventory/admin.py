@@ -1,7 +1,7 @@
 # inventory/admin.py
 from django.contrib import admin
 from django.db.models import Count, Sum
-from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 from django.utils import timezone
 from .models import (
     Category, Product, ProductStock, Purchase, PurchaseItem,
@@ -10,6 +10,11 @@ from .models import (
     PurchaseOrder, PurchaseOrderItem, SaleOrder, SaleOrderItem
 )
 
+# Stock status badges are constant, so build them once instead of per row
+_OUT_OF_STOCK = mark_safe('<span style="color: red;">● Out of Stock</span>')
+_LOW_STOCK = mark_safe('<span style="color: orange;">● Low Stock</span>')
+_IN_STOCK = mark_safe('<span style="color: green;">● In Stock</span>')
+
 # ==================== CATEGORY ADMIN ====================
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -30,6 +35,9 @@ class ProductAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'total_stock_display']
     list_per_page = 20
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_total_stock()
+
     def total_stock_display(self, obj):
         return obj.total_stock
     total_stock_display.short_description = 'Total Stock'
@@ -44,11 +52,11 @@ class ProductStockAdmin(admin.ModelAdmin):
     
     def stock_status(self, obj):
         if obj.quantity == 0:
-            return format_html('<span style="color: red;">● Out of Stock</span>')
+            return _OUT_OF_STOCK
         elif obj.quantity <= obj.product.reorder_level:
-            return format_html('<span style="color: orange;">● Low Stock</span>')
+            return _LOW_STOCK
         else:
-            return format_html('<span style="color: green;">● In Stock</span>')
+            return _IN_STOCK
     stock_status.short_description = 'Status'
 
 # ==================== PURCHASE ITEM INLINE ====================
@@ -86,13 +94,14 @@ class PurchaseAdmin(admin.ModelAdmin):
     def total_quantity(self, obj):
         return obj.get_total_quantity()
     total_quantity.short_description = 'Total Qty'
+    total_quantity.admin_order_field = '_total_quantity'
     
     def purchase_date_display(self, obj):
         return obj.purchase_date
     purchase_date_display.short_description = 'Purchase Date'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('items')
+        return super().get_queryset(request).with_total_quantity().prefetch_related('items')
     
     def save_model(self, request, obj, form, change):
         if not obj.pk:
@@ -232,9 +241,10 @@ class TransferBatchAdmin(admin.ModelAdmin):
     def total_quantity(self, obj):
         return obj.get_total_quantity()
     total_quantity.short_description = 'Total Qty'
+    total_quantity.admin_order_field = '_total_quantity'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('items')
+        return super().get_queryset(request).with_total_quantity().prefetch_related('items')
     
     def confirm_batches(self, request, queryset):
         successful = 0
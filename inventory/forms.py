@@ -1,48 +1,127 @@
 import json
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse_lazy
 from django.utils import timezone
-from .models import Product, ProductStock, RetailSale, RetailStock, Sale, SaleItem, Payment
+from .models import (
+    Product, ProductStock, RetailSale, RetailStock, Sale, SaleItem, Payment,
+    Purchase, TransferBatch, PurchaseOrder, SaleOrder, CompanyDetails,
+)
 from core.models import Location
 from transactions.models import Customer
 
+# Widget attrs shared by most fields below. Widget.__init__ copies attrs,
+# so one dict per style serves every form without aliasing.
+FORM_CONTROL = {'class': 'form-control'}
+FORM_CONTROL_SELECT2 = {'class': 'form-control select2'}
+TEXTAREA_3_ROWS = {'class': 'form-control', 'rows': 3}
+
+# Choice querysets for product/customer selects; both __str__ methods only
+# read the name, so the other columns are never loaded. ModelChoiceField
+# clones these, so sharing them between forms is safe.
+PRODUCT_CHOICES = Product.objects.only('id', 'name').order_by('name')
+CUSTOMER_CHOICES = Customer.objects.only('id', 'name').order_by('name')
+
+class AjaxModelSelect(forms.Select):
+    """Select that renders only the selected option.
+
+    The remaining options are fetched by select2 from the search endpoint in
+    ``data-autocomplete-url``, so a form render no longer serializes the whole
+    table. Validation still runs against the field's full queryset.
+    """
+
+    def __init__(self, url, attrs=None):
+        attrs = {**(attrs or {}), 'data-autocomplete-url': url}
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        iterator = self.choices
+        if not isinstance(iterator, ModelChoiceIterator):
+            return super().optgroups(name, value, attrs)
+
+        choices = []
+        if iterator.field.empty_label is not None:
+            choices.append(('', iterator.field.empty_label))
+        selected = [v for v in value if v not in ('', None)]
+        if selected:
+            try:
+                choices += [iterator.choice(obj) for obj in iterator.queryset.filter(pk__in=selected)]
+            except (ValueError, TypeError, ValidationError):
+                # Garbage posted back; render nothing selected
+                pass
+
+        self.choices = choices
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = iterator
+
+def set_initial_location(form, field_name, user):
+    """Default a location field to the user's assigned location (non-admins only)"""
+    # Django caches the reverse one-to-one (misses included) on the user
+    # instance, so every form built for request.user shares one profile query
+    profile = getattr(user, 'profile', None)
+    if profile and not profile.can_access_all_locations and profile.assigned_location_id:
+        # The raw FK id is enough for a ModelChoiceField initial, so the
+        # Location row itself is never loaded
+        form.fields[field_name].initial = profile.assigned_location_id
+
+class LocationScopedFormMixin:
+    """Takes ``locations``/``user`` kwargs for forms with location fields.
+
+    Every field in ``location_fields`` is limited to ``locations`` when given,
+    and the first one defaults to the user's assigned location.
+    """
+    location_fields = ('location',)
+
+    def __init__(self, *args, **kwargs):
+        self.locations = kwargs.pop('locations', None)
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        
+        # Limit locations to user's accessible locations
+        if self.locations is not None:
+            for field_name in self.location_fields:
+                self.fields[field_name].queryset = self.locations
+        
+        # Set initial location for non-admin users
+        set_initial_location(self, self.location_fields[0], self.user)
+
+class ItemsDataForm(forms.ModelForm):
+    """Base for forms whose line items are posted as a JSON list in items_data"""
+    items_data = forms.CharField(
+        widget=forms.HiddenInput(attrs={'id': 'id_items_data'}),
+        required=False,
+        initial='[]'
+    )
+
 class ProductForm(forms.ModelForm):
     class Meta:
         model = Product
         fields = ['name', 'category', 'sku', 'cost_price', 'selling_price', 'reorder_level']
         widgets = {
-            'name': forms.TextInput(attrs={'class': 'form-control'}),
-            'category': forms.Select(attrs={'class': 'form-control'}),
-            'sku': forms.TextInput(attrs={'class': 'form-control'}),
+            'name': forms.TextInput(attrs=FORM_CONTROL),
+            'category': forms.Select(attrs=FORM_CONTROL),
+            'sku': forms.TextInput(attrs=FORM_CONTROL),
             'cost_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'selling_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
-            'reorder_level': forms.NumberInput(attrs={'class': 'form-control'}),
+            'reorder_level': forms.NumberInput(attrs=FORM_CONTROL),
         }
 
-class ProductStockForm(forms.ModelForm):
+class ProductStockForm(LocationScopedFormMixin, forms.ModelForm):
     class Meta:
         model = ProductStock
         fields = ['product', 'location', 'quantity']
         widgets = {
-            'product': forms.Select(attrs={'class': 'form-control'}),
-            'location': forms.Select(attrs={'class': 'form-control'}),
-            'quantity': forms.NumberInput(attrs={'class': 'form-control'}),
+            'product': forms.Select(attrs=FORM_CONTROL),
+            'location': forms.Select(attrs=FORM_CONTROL),
+            'quantity': forms.NumberInput(attrs=FORM_CONTROL),
         }
 
-    def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
-        super().__init__(*args, **kwargs)
-        
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
-
-class RetailSaleForm(forms.ModelForm):
+class RetailSaleForm(LocationScopedFormMixin, forms.ModelForm):
     current_stock = forms.DecimalField(
         required=False,
         decimal_places=2,
@@ -58,7 +137,7 @@ class RetailSaleForm(forms.ModelForm):
         model = RetailSale
         fields = ['product', 'location', 'amount_given', 'unit_price', 'current_stock']
         widgets = {
-            'product': forms.Select(attrs={
+            'product': AjaxModelSelect(reverse_lazy('inventory:product_search_api'), attrs={
                 'class': 'form-control select2',
                 'data-placeholder': 'Select a product...'
             }),
@@ -89,31 +168,30 @@ class RetailSaleForm(forms.ModelForm):
         }
 
     def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
         # Use all products since there's no is_active field
-        self.fields['product'].queryset = Product.objects.all()
-        
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
-        
-        # Set initial current_stock value if instance exists
-        if self.instance and self.instance.pk:
-            try:
-                stock = ProductStock.objects.get(
-                    product=self.instance.product,
-                    location=self.instance.location
-                )
-                self.fields['current_stock'].initial = stock.quantity
-            except ProductStock.DoesNotExist:
-                self.fields['current_stock'].initial = 0
+        self.fields['product'].queryset = PRODUCT_CHOICES
+
+    def get_initial_for_field(self, field, field_name):
+        # current_stock for an existing sale is looked up only when the field
+        # is actually read, and shares the memoized lookup with clean()
+        if (field_name == 'current_stock' and field.initial is None
+                and self.instance and self.instance.pk):
+            quantity = self._get_main_stock(self.instance.product_id, self.instance.location_id)
+            return quantity if quantity is not None else 0
+        return super().get_initial_for_field(field, field_name)
+
+    def _get_main_stock(self, product_id, location_id):
+        """Main stock quantity for a product/location (None if no row), fetched once per form"""
+        if not hasattr(self, '_main_stock_cache'):
+            self._main_stock_cache = {}
+        key = (product_id, location_id)
+        if key not in self._main_stock_cache:
+            self._main_stock_cache[key] = ProductStock.objects.filter(
+                product_id=product_id, location_id=location_id
+            ).values_list('quantity', flat=True).first()
+        return self._main_stock_cache[key]
 
     def clean(self):
         cleaned_data = super().clean()
@@ -124,17 +202,21 @@ class RetailSaleForm(forms.ModelForm):
 
         # Validate that product and location are selected
         if product and location:
-            try:
-                # Check if main stock exists
-                main_stock = ProductStock.objects.get(product=product, location=location)
-                
+            # Check if main stock exists
+            main_quantity = self._get_main_stock(product.pk, location.pk)
+            if main_quantity is None:
+                self.add_error('product', "No stock available for this product at selected location")
+                self.cleaned_data['current_stock'] = 0
+            else:
                 # Calculate required quantity
+                # (a float pre-check; save() does the authoritative Decimal
+                # division for quantity_given)
                 if amount_given and unit_price and unit_price > 0:
-                    quantity_needed = amount_given / unit_price
+                    quantity_needed = float(amount_given) / float(unit_price)
                     
                     # Check stock availability
-                    if main_stock.quantity < quantity_needed:
-                        available = main_stock.quantity
+                    if float(main_quantity) < quantity_needed:
+                        available = main_quantity
                         self.add_error(
                             'amount_given',
                             f"Insufficient stock. Available: {available:.2f} units. "
@@ -145,11 +227,7 @@ class RetailSaleForm(forms.ModelForm):
                         self.fields['current_stock'].initial = available
                 
                 # Set current stock value for display
-                self.cleaned_data['current_stock'] = main_stock.quantity
-                
-            except ProductStock.DoesNotExist:
-                self.add_error('product', "No stock available for this product at selected location")
-                self.cleaned_data['current_stock'] = 0
+                self.cleaned_data['current_stock'] = main_quantity
 
         # Validate amount and unit price
         if amount_given and amount_given <= 0:
@@ -176,15 +254,15 @@ class RetailSaleForm(forms.ModelForm):
         
         return instance
 
-class RetailStockTransferForm(forms.Form):
+class RetailStockTransferForm(LocationScopedFormMixin, forms.Form):
     """Form for transferring stock between main inventory and retail"""
     product = forms.ModelChoiceField(
-        queryset=Product.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-control'})
+        queryset=PRODUCT_CHOICES,
+        widget=forms.Select(attrs=FORM_CONTROL)
     )
     location = forms.ModelChoiceField(
         queryset=Location.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-control'})
+        widget=forms.Select(attrs=FORM_CONTROL)
     )
     quantity = forms.DecimalField(
         max_digits=10,
@@ -204,18 +282,13 @@ class RetailStockTransferForm(forms.Form):
         widget=forms.RadioSelect(attrs={'class': 'form-check-input'})
     )
 
-    def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
-        super().__init__(*args, **kwargs)
-        
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
+    def clean_quantity(self):
+        quantity = self.cleaned_data['quantity']
+        # Main stock only holds whole units, so a fraction could not move by
+        # the same amount on both sides
+        if quantity != quantity.to_integral_value():
+            raise ValidationError("Transfers must be in whole units")
+        return quantity
 
     def clean(self):
         cleaned_data = super().clean()
@@ -225,35 +298,66 @@ class RetailStockTransferForm(forms.Form):
         transfer_type = cleaned_data.get('transfer_type')
 
         if product and location and quantity:
-            try:
-                main_stock = ProductStock.objects.get(product=product, location=location)
-                retail_stock, _ = RetailStock.objects.get_or_create(
-                    product=product, location=location
-                )
+            # Read both quantities in one query; a missing retail row counts
+            # as empty, so validation never has to create it
+            retail_quantity = RetailStock.objects.filter(
+                product=OuterRef('product'), location=OuterRef('location')
+            ).values('quantity')[:1]
+            quantities = ProductStock.objects.filter(
+                product=product, location=location
+            ).annotate(
+                retail_quantity=Subquery(retail_quantity)
+            ).values_list('quantity', 'retail_quantity').first()
+
+            if quantities is None:
+                self.add_error('product', "No stock available for this product at selected location")
+            else:
+                main_available, retail_available = quantities
+                retail_available = retail_available or 0
+                cleaned_data['main_quantity'] = main_available
+                cleaned_data['retail_quantity'] = retail_available
 
-                if transfer_type == 'TO_RETAIL' and main_stock.quantity < quantity:
+                if transfer_type == 'TO_RETAIL' and main_available < quantity:
                     self.add_error(
                         'quantity',
-                        f"Not enough stock in main inventory. Available: {main_stock.quantity}"
+                        f"Not enough stock in main inventory. Available: {main_available}"
                     )
-                elif transfer_type == 'TO_MAIN' and retail_stock.quantity < quantity:
+                elif transfer_type == 'TO_MAIN' and retail_available < quantity:
                     self.add_error(
                         'quantity',
-                        f"Not enough stock in retail. Available: {retail_stock.quantity}"
+                        f"Not enough stock in retail. Available: {retail_available}"
                     )
 
-            except ProductStock.DoesNotExist:
-                self.add_error('product', "No stock available for this product at selected location")
-
         return cleaned_data
 
-class SaleForm(forms.ModelForm):
-    items_data = forms.CharField(
-        widget=forms.HiddenInput(attrs={'id': 'id_items_data'}),
-        required=False,
-        initial='[]'
-    )
-    
+    def save(self):
+        """Apply the validated transfer; the retail row is created here, not in clean()"""
+        product = self.cleaned_data['product']
+        location = self.cleaned_data['location']
+        # Whole units (see clean_quantity), so both sides move the same amount
+        quantity = int(self.cleaned_data['quantity'])
+
+        with transaction.atomic():
+            retail_stock, _ = RetailStock.objects.only('id', 'quantity').get_or_create(product=product, location=location)
+            main_stock = ProductStock.objects.filter(product=product, location=location)
+            retail_rows = RetailStock.objects.filter(pk=retail_stock.pk)
+
+            # clean() read the quantities in an earlier step, so each decrement
+            # re-checks availability in its own UPDATE; a concurrent transfer
+            # that got there first leaves nothing updated
+            if self.cleaned_data['transfer_type'] == 'TO_RETAIL':
+                if not main_stock.filter(quantity__gte=quantity).update(quantity=F('quantity') - quantity):
+                    raise ValidationError("Not enough stock in main inventory")
+                retail_rows.update(quantity=F('quantity') + quantity)
+            else:
+                if not retail_rows.filter(quantity__gte=quantity).update(quantity=F('quantity') - quantity):
+                    raise ValidationError("Not enough stock in retail")
+                main_stock.update(quantity=F('quantity') + quantity)
+
+        retail_stock.refresh_from_db(fields=['quantity'])
+        return retail_stock
+
+class SaleForm(LocationScopedFormMixin, ItemsDataForm):
     class Meta:
         model = Sale
         fields = [
@@ -262,11 +366,11 @@ class SaleForm(forms.ModelForm):
         ]
         widgets = {
             'document_type': forms.Select(attrs={'class': 'form-control', 'id': 'document_type'}),
-            'customer': forms.Select(attrs={
+            'customer': AjaxModelSelect(reverse_lazy('inventory:customer_search_api'), attrs={
                 'class': 'form-control select2',
                 'data-placeholder': 'Search or select customer...'
             }),
-            'location': forms.Select(attrs={'class': 'form-control select2'}),
+            'location': forms.Select(attrs=FORM_CONTROL_SELECT2),
             'paid_amount': forms.NumberInput(attrs={
                 'class': 'form-control', 
                 'step': '0.01',
@@ -274,34 +378,19 @@ class SaleForm(forms.ModelForm):
             }),
             'date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
             'due_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
-            'currency': forms.Select(attrs={'class': 'form-control'}),
-            'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'currency': forms.Select(attrs=FORM_CONTROL),
+            'notes': forms.Textarea(attrs=TEXTAREA_3_ROWS),
             'terms': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
         }
 
     def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Get models from other apps
-        Customer = __import__('transactions.models', fromlist=['Customer']).Customer
-        Location = __import__('core.models', fromlist=['Location']).Location
-        
         # Set querysets
-        self.fields['customer'].queryset = Customer.objects.all()
-        
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
+        self.fields['customer'].queryset = CUSTOMER_CHOICES
         self.fields['customer'].required = False
         self.fields['customer'].empty_label = "Select Customer"
         
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
-        
         # Set initial dates
         if not self.instance.pk:
             self.fields['date'].initial = timezone.now()
@@ -315,6 +404,10 @@ class SaleForm(forms.ModelForm):
         items_data = cleaned_data.get('items_data', '[]')
         location = cleaned_data.get('location')
         
+        # An empty cart is rejected before paying for a JSON parse
+        if not items_data or items_data == '[]':
+            raise ValidationError("Please add at least one product to the sale")
+        
         # Parse items data
         try:
             items = json.loads(items_data)
@@ -322,7 +415,7 @@ class SaleForm(forms.ModelForm):
             raise ValidationError("Invalid items data format")
         
         # Validate at least one item
-        if not items or len(items) == 0:
+        if not items:
             raise ValidationError("Please add at least one product to the sale")
         
         # Customer is required for invoices
@@ -330,28 +423,46 @@ class SaleForm(forms.ModelForm):
             raise ValidationError("Customer is required for invoices.")
         
         # Calculate total amount from items
-        total_amount = sum(float(item.get('total', 0)) for item in items)
+        total_amount = sum(float(item.get('total') or 0) for item in items)
         
         # Paid amount cannot exceed total amount
         if paid_amount > total_amount:
             raise ValidationError(f"Paid amount (${paid_amount}) cannot exceed total amount (${total_amount:.2f}).")
         
-        # Validate stock availability for each item
+        # Validate stock availability for each item, fetching every line's
+        # stock row in one query
+        lines = []
         for item in items:
             product_id = item.get('product_id')
             quantity = int(item.get('quantity', 0))
-            
-            if product_id and location and quantity > 0:
-                try:
-                    product = Product.objects.get(id=product_id)
-                    stock = ProductStock.objects.get(product=product, location=location)
-                    if stock.quantity < quantity:
-                        raise ValidationError(
-                            f"Not enough stock for {product.name}. Available: {stock.quantity}, Requested: {quantity}"
-                        )
-                except ProductStock.DoesNotExist:
-                    raise ValidationError(f"No stock found for {product.name} at {location.name}")
-        
+            if product_id and quantity > 0:
+                lines.append((int(product_id), quantity))
+
+        if location and lines:
+            # Plain (product_id, quantity) pairs from one indexed query; no
+            # model instances and no join to products on the happy path
+            stocks = dict(
+                ProductStock.objects.filter(
+                    location=location, product_id__in=[product_id for product_id, _ in lines]
+                ).values_list('product_id', 'quantity')
+            )
+
+            for product_id, quantity in lines:
+                available = stocks.get(product_id)
+                if available is not None and available >= quantity:
+                    continue
+
+                # Validation stops at the first bad line, so its name is the
+                # only one ever needed
+                name = Product.objects.filter(id=product_id).values_list('name', flat=True).first()
+                if name is None:
+                    raise ValidationError(f"Product {product_id} not found")
+                if available is None:
+                    raise ValidationError(f"No stock found for {name} at {location.name}")
+                raise ValidationError(
+                    f"Not enough stock for {name}. Available: {available}, Requested: {quantity}"
+                )
+
         return cleaned_data
 
     def save(self, commit=True):
@@ -378,8 +489,8 @@ class PaymentForm(forms.ModelForm):
                 'class': 'form-control',
                 'type': 'datetime-local'
             }),
-            'payment_method': forms.Select(attrs={'class': 'form-control'}),
-            'reference_number': forms.TextInput(attrs={'class': 'form-control'}),
+            'payment_method': forms.Select(attrs=FORM_CONTROL),
+            'reference_number': forms.TextInput(attrs=FORM_CONTROL),
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
         }
 
@@ -388,17 +499,19 @@ class PaymentForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
+        # Read once so the widget limit and clean_amount agree on the same value
+        self._balance_due = self.sale.balance_due if self.sale else None
+
         if self.sale:
             # Set max amount to balance due
-            max_amount = self.sale.balance_due
-            self.fields['amount'].widget.attrs['max'] = max_amount
-            self.fields['amount'].help_text = f'Balance due: {max_amount:.2f}'
+            self.fields['amount'].widget.attrs['max'] = self._balance_due
+            self.fields['amount'].help_text = f'Balance due: {self._balance_due:.2f}'
 
     def clean_amount(self):
         amount = self.cleaned_data['amount']
-        if self.sale and amount > self.sale.balance_due:
+        if self.sale and amount > self._balance_due:
             raise ValidationError(
-                f"Payment amount cannot exceed balance due of {self.sale.balance_due:.2f}"
+                f"Payment amount cannot exceed balance due of {self._balance_due:.2f}"
             )
         return amount
 
@@ -413,71 +526,40 @@ class PaymentForm(forms.ModelForm):
             instance.save()
         return instance
 
-class PurchaseForm(forms.ModelForm):
-    items_data = forms.CharField(
-        widget=forms.HiddenInput(attrs={'id': 'id_items_data'}),
-        required=False,
-        initial='[]'
-    )
-    
+class PurchaseForm(LocationScopedFormMixin, ItemsDataForm):
     class Meta:
-        model = __import__('inventory.models', fromlist=['Purchase']).Purchase
+        model = Purchase
         fields = ['supplier_name', 'location', 'purchase_date', 'notes', 'items_data']
         widgets = {
-            'supplier_name': forms.TextInput(attrs={'class': 'form-control'}),
-            'location': forms.Select(attrs={'class': 'form-control select2'}),
+            'supplier_name': forms.TextInput(attrs=FORM_CONTROL),
+            'location': forms.Select(attrs=FORM_CONTROL_SELECT2),
             'purchase_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
-            'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'notes': forms.Textarea(attrs=TEXTAREA_3_ROWS),
         }
 
     def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
-        
         # Set initial date
         if not self.instance.pk:
             self.fields['purchase_date'].initial = timezone.now()
 
-class TransferForm(forms.ModelForm):
-    items_data = forms.CharField(
-        widget=forms.HiddenInput(attrs={'id': 'id_items_data'}),
-        required=False,
-        initial='[]'
-    )
-    
+class TransferForm(LocationScopedFormMixin, ItemsDataForm):
+    location_fields = ('from_location', 'to_location')
+
     class Meta:
-        model = __import__('inventory.models', fromlist=['TransferBatch']).TransferBatch
+        model = TransferBatch
         fields = ['from_location', 'to_location', 'transfer_date', 'notes', 'items_data']
         widgets = {
-            'from_location': forms.Select(attrs={'class': 'form-control select2'}),
-            'to_location': forms.Select(attrs={'class': 'form-control select2'}),
+            'from_location': forms.Select(attrs=FORM_CONTROL_SELECT2),
+            'to_location': forms.Select(attrs=FORM_CONTROL_SELECT2),
             'transfer_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
-            'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'notes': forms.Textarea(attrs=TEXTAREA_3_ROWS),
         }
 
     def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['from_location'].queryset = self.locations
-            self.fields['to_location'].queryset = self.locations
-        
-        # Set initial from_location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['from_location'].initial = self.user.profile.assigned_location
-        
         # Set initial date
         if not self.instance.pk:
             self.fields['transfer_date'].initial = timezone.now()
@@ -492,84 +574,47 @@ class TransferForm(forms.ModelForm):
         
         return cleaned_data
 
-class PurchaseOrderForm(forms.ModelForm):
-    items_data = forms.CharField(
-        widget=forms.HiddenInput(attrs={'id': 'id_items_data'}),
-        required=False,
-        initial='[]'
-    )
-    
+class PurchaseOrderForm(LocationScopedFormMixin, ItemsDataForm):
     class Meta:
-        model = __import__('inventory.models', fromlist=['PurchaseOrder']).PurchaseOrder
+        model = PurchaseOrder
         fields = ['supplier_name', 'location', 'order_date', 'expected_date', 'notes', 'items_data']
         widgets = {
-            'supplier_name': forms.TextInput(attrs={'class': 'form-control'}),
-            'location': forms.Select(attrs={'class': 'form-control select2'}),
+            'supplier_name': forms.TextInput(attrs=FORM_CONTROL),
+            'location': forms.Select(attrs=FORM_CONTROL_SELECT2),
             'order_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
             'expected_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
-            'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'notes': forms.Textarea(attrs=TEXTAREA_3_ROWS),
         }
 
     def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
-        
         # Set initial dates
         if not self.instance.pk:
             self.fields['order_date'].initial = timezone.now()
             self.fields['expected_date'].initial = timezone.now().date() + timezone.timedelta(days=7)
 
-class SaleOrderForm(forms.ModelForm):
-    items_data = forms.CharField(
-        widget=forms.HiddenInput(attrs={'id': 'id_items_data'}),
-        required=False,
-        initial='[]'
-    )
-    
+class SaleOrderForm(LocationScopedFormMixin, ItemsDataForm):
     class Meta:
-        model = __import__('inventory.models', fromlist=['SaleOrder']).SaleOrder
+        model = SaleOrder
         fields = ['customer', 'location', 'sale_date', 'notes', 'items_data']
         widgets = {
-            'customer': forms.Select(attrs={'class': 'form-control select2'}),
-            'location': forms.Select(attrs={'class': 'form-control select2'}),
+            'customer': forms.Select(attrs=FORM_CONTROL_SELECT2),
+            'location': forms.Select(attrs=FORM_CONTROL_SELECT2),
             'sale_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
-            'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'notes': forms.Textarea(attrs=TEXTAREA_3_ROWS),
         }
 
     def __init__(self, *args, **kwargs):
-        self.locations = kwargs.pop('locations', None)
-        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Get customer model
-        Customer = __import__('transactions.models', fromlist=['Customer']).Customer
-        
         # Set querysets
-        self.fields['customer'].queryset = Customer.objects.all()
-        
-        # Limit locations to user's accessible locations
-        if self.locations is not None:
-            self.fields['location'].queryset = self.locations
-        
-        # Set initial location for non-admin users
-        if self.user and not self.user.profile.can_access_all_locations and self.user.profile.assigned_location:
-            self.fields['location'].initial = self.user.profile.assigned_location
+        self.fields['customer'].queryset = CUSTOMER_CHOICES
         
         # Set initial date
         if not self.instance.pk:
             self.fields['sale_date'].initial = timezone.now()
 
-from .models import CompanyDetails
-
 class CompanyDetailsForm(forms.ModelForm):
     class Meta:
         model = CompanyDetails
@@ -580,26 +625,22 @@ class CompanyDetailsForm(forms.ModelForm):
             'invoice_footer', 'quotation_footer'
         ]
         widgets = {
-            'name': forms.TextInput(attrs={'class': 'form-control'}),
-            'address': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
-            'phone': forms.TextInput(attrs={'class': 'form-control'}),
-            'email': forms.EmailInput(attrs={'class': 'form-control'}),
-            'website': forms.URLInput(attrs={'class': 'form-control'}),
-            'tax_id': forms.TextInput(attrs={'class': 'form-control'}),
-            'bank_name': forms.TextInput(attrs={'class': 'form-control'}),
-            'bank_account': forms.TextInput(attrs={'class': 'form-control'}),
-            'bank_branch': forms.TextInput(attrs={'class': 'form-control'}),
-            'invoice_prefix': forms.TextInput(attrs={'class': 'form-control'}),
-            'quotation_prefix': forms.TextInput(attrs={'class': 'form-control'}),
-            'receipt_prefix': forms.TextInput(attrs={'class': 'form-control'}),
-            'invoice_footer': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
-            'quotation_footer': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'name': forms.TextInput(attrs=FORM_CONTROL),
+            'address': forms.Textarea(attrs=TEXTAREA_3_ROWS),
+            'phone': forms.TextInput(attrs=FORM_CONTROL),
+            'email': forms.EmailInput(attrs=FORM_CONTROL),
+            'website': forms.URLInput(attrs=FORM_CONTROL),
+            'tax_id': forms.TextInput(attrs=FORM_CONTROL),
+            'bank_name': forms.TextInput(attrs=FORM_CONTROL),
+            'bank_account': forms.TextInput(attrs=FORM_CONTROL),
+            'bank_branch': forms.TextInput(attrs=FORM_CONTROL),
+            'invoice_prefix': forms.TextInput(attrs=FORM_CONTROL),
+            'quotation_prefix': forms.TextInput(attrs=FORM_CONTROL),
+            'receipt_prefix': forms.TextInput(attrs=FORM_CONTROL),
+            'invoice_footer': forms.Textarea(attrs=TEXTAREA_3_ROWS),
+            'quotation_footer': forms.Textarea(attrs=TEXTAREA_3_ROWS),
         }   
 
-
-from django import forms
-from .models import Payment
-
 class SalePaymentForm(forms.ModelForm):
     class Meta:
         model = Payment
@@ -632,5 +673,4 @@ class SalePaymentForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Set initial date to today
-        from django.utils import timezone
         self.fields['payment_date'].initial = timezone.now().date()
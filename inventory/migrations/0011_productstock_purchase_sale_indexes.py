@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_loginverification'),
+        ('inventory', '0010_stocktake_stocktakeitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productstock',
+            index=models.Index(fields=['location', 'product'], name='inv_stock_location_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productstock',
+            index=models.Index(fields=['product', 'quantity'], name='inv_stock_product_qty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['location', '-purchase_date'], name='inv_purchase_location_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['location', '-date'], name='inv_sale_location_date_idx'),
+        ),
+    ]
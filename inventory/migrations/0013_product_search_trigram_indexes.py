@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+# Django renders name__icontains / sku__icontains on PostgreSQL as
+# UPPER("col"::text) LIKE UPPER(%s), so the trigram indexes are built on
+# that exact expression to be usable by the existing lookups.
+TRIGRAM_INDEXES = [
+    ('inventory_product_name_trgm', 'name'),
+    ('inventory_product_sku_trgm', 'sku'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON inventory_product '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_reorder_levels(apps, schema_editor):
+    Product = apps.get_model('inventory', 'Product')
+    ProductStock = apps.get_model('inventory', 'ProductStock')
+    ProductStock.objects.update(
+        reorder_level=Subquery(
+            Product.objects.filter(pk=OuterRef('product_id')).values('reorder_level')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_loginverification'),
+        ('inventory', '0013_product_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productstock',
+            name='reorder_level',
+            field=models.IntegerField(default=10, editable=False),
+        ),
+        migrations.RunPython(copy_reorder_levels, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='productstock',
+            name='is_low',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(quantity__lt=models.F('reorder_level'), then=models.Value(True)), default=models.Value(False)), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='productstock',
+            index=models.Index(fields=['location', 'is_low'], name='inv_stock_location_low_idx'),
+        ),
+    ]
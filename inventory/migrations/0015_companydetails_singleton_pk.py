@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-16 11:00
+
+from django.db import migrations
+
+
+def move_company_details_to_pk_1(apps, schema_editor):
+    CompanyDetails = apps.get_model('inventory', 'CompanyDetails')
+    # CompanyDetails.save() used to fold every save into the first row, so
+    # that row holds the live settings; it becomes the pk=1 singleton
+    first = CompanyDetails.objects.order_by('pk').first()
+    if first is None or first.pk == 1:
+        CompanyDetails.objects.exclude(pk=1).delete()
+        return
+    CompanyDetails.objects.exclude(pk=first.pk).delete()
+    CompanyDetails.objects.filter(pk=first.pk).update(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_productstock_is_low'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_company_details_to_pk_1, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_companydetails_singleton_pk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('invoice', 'Invoice'), ('quotation', 'Quotation'), ('receipt', 'Receipt'), ('delivery_note', 'Delivery Note'), ('credit_note', 'Credit Note')], max_length=20, unique=True)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_loginverification'),
+        ('inventory', '0016_documentcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['document_status', '-date'], name='inv_sale_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stocktakeitem',
+            index=models.Index(fields=['stock_take', 'quantity_counted'], name='inv_stocktakeitem_counted_idx'),
+        ),
+    ]
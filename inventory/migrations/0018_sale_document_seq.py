@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-16 13:00
+
+from django.db import migrations, models
+
+
+def backfill_document_seq(apps, schema_editor):
+    Sale = apps.get_model('inventory', 'Sale')
+    sales = list(Sale.objects.exclude(document_number='').only('id', 'document_number'))
+    for sale in sales:
+        try:
+            sale.document_seq = int(sale.document_number.split('-')[-1])
+        except ValueError:
+            continue
+    Sale.objects.bulk_update(sales, ['document_seq'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_loginverification'),
+        ('inventory', '0017_sale_stocktakeitem_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='document_seq',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_document_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['document_type', 'document_seq'], name='inv_sale_type_seq_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-16 14:00
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_loginverification'),
+        ('inventory', '0018_sale_document_seq'),
+    ]
+
+    operations = [
+        # A stored column cannot be altered into a generated one in place
+        migrations.RemoveField(
+            model_name='stocktakeitem',
+            name='variance',
+        ),
+        migrations.AddField(
+            model_name='stocktakeitem',
+            name='variance',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce(models.F('quantity_counted') - models.F('quantity_on_hand'), models.Value(0)), output_field=models.IntegerField()),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+# Extends the trigram indexes from 0013 to the remaining icontains searches
+# of product_list (category name) and purchase_list (supplier, reference),
+# again built on the UPPER("col"::text) expression Django emits.
+TRIGRAM_INDEXES = [
+    ('inventory_category_name_trgm', 'inventory_category', 'name'),
+    ('inventory_purchase_supplier_trgm', 'inventory_purchase', 'supplier_name'),
+    ('inventory_purchase_reference_trgm', 'inventory_purchase', 'reference'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_stocktakeitem_variance_generated'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
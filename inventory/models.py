@@ -1,9 +1,20 @@
-from django.db import models
-from django.db.models import Sum
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan, LessThanOrEqual
 from django.contrib.auth.models import User
 from core.models import Location
 from transactions.models import Customer
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+# Quantum of the two-decimal money/quantity columns, parsed once
+CENT = Decimal('0.01')
+
+# Cache key of the category filter list; cleared by the Category signals
+CATEGORY_LIST_CACHE_KEY = 'inv:categories'
 
 # Define choices at the top of the file - REMOVE DUPLICATES
 class DocumentType(models.TextChoices):
@@ -43,6 +54,34 @@ class Supplier(models.Model):
     def __str__(self):
         return self.name
 
+class ProductQuerySet(models.QuerySet):
+    def with_total_stock(self):
+        """Annotate the stock summed over all locations, read by total_stock"""
+        return self.annotate(_total_stock=Sum('stocks__quantity', default=0))
+
+    def with_stock(self, location_ids=None):
+        """Annotate total_stock, optionally over ``location_ids`` only, and stock_status.
+
+        The sum is a per-product subquery, so it stays correct when the
+        queryset is later joined or filtered on other relations.
+        """
+        stock = ProductStock.objects.filter(product=OuterRef('pk'))
+        if location_ids is not None:
+            stock = stock.filter(location_id__in=location_ids)
+        stock_total = stock.order_by().values('product').annotate(total=Sum('quantity')).values('total')
+        return self.annotate(
+            _total_stock=Coalesce(Subquery(stock_total), 0),
+        ).annotate(
+            # Same statuses as the stock status report
+            stock_status=Case(
+                When(_total_stock__lte=0, then=Value('out_of_stock')),
+                When(_total_stock__lte=F('reorder_level'), then=Value('low_stock')),
+                When(_total_stock__gt=F('reorder_level') * 3, then=Value('excess_stock')),
+                default=Value('normal'),
+                output_field=models.CharField(),
+            ),
+        )
+
 class Product(models.Model):
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     name = models.CharField(max_length=200)
@@ -51,25 +90,132 @@ class Product(models.Model):
     selling_price = models.DecimalField(max_digits=10, decimal_places=2)
     reorder_level = models.IntegerField(default=10)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = ProductQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
     @property
     def total_stock(self):
-        return sum(stock.quantity for stock in self.stocks.all())
+        if hasattr(self, '_total_stock'):
+            return self._total_stock
+        # Reuse prefetched rows when present, otherwise let the database sum
+        if 'stocks' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(stock.quantity for stock in self.stocks.all())
+        return self.stocks.aggregate(total=Sum('quantity', default=0))['total']
+
+class ProductStockQuerySet(models.QuerySet):
+    def locked_quantities(self, location, product_ids):
+        """``{product_id: quantity}`` at ``location``, rows locked for update"""
+        return dict(
+            self.filter(location=location, product_id__in=product_ids)
+            .select_for_update().values_list('product_id', 'quantity')
+        )
+
+    def deduct_quantities(self, location, quantities):
+        """Subtract ``{product_id: quantity}`` from the stock rows at ``location`` in one UPDATE"""
+        self.filter(location=location, product_id__in=quantities).update(quantity=Case(
+            *[When(product_id=product_id, then=F('quantity') - quantity)
+              for product_id, quantity in quantities.items()],
+            default=F('quantity'),
+            output_field=models.PositiveIntegerField(),
+        ))
+
+    def add_quantities(self, location, quantities):
+        """Add ``{product_id: quantity}`` to the stock rows at ``location``.
+
+        Existing rows are locked and incremented in one CASE update and
+        missing ones are bulk-created, so the query count does not grow with
+        the number of products.
+        """
+        with transaction.atomic():
+            rows = self.filter(location=location, product_id__in=quantities)
+            existing = set(rows.select_for_update().values_list('product_id', flat=True))
+            if existing:
+                rows.update(quantity=Case(
+                    *[When(product_id=product_id, then=F('quantity') + quantities[product_id])
+                      for product_id in existing],
+                    default=F('quantity'),
+                    output_field=models.PositiveIntegerField(),
+                ))
+
+            missing = [product_id for product_id in quantities if product_id not in existing]
+            if missing:
+                # bulk_create skips save(), so reorder_level is copied here
+                reorder_levels = dict(
+                    Product.objects.filter(pk__in=missing).values_list('pk', 'reorder_level')
+                )
+                self.bulk_create([
+                    self.model(
+                        product_id=product_id,
+                        location=location,
+                        quantity=quantities[product_id],
+                        reorder_level=reorder_levels[product_id],
+                    )
+                    for product_id in missing
+                ])
 
 class ProductStock(models.Model):
     product = models.ForeignKey(Product, related_name='stocks', on_delete=models.CASCADE)
     location = models.ForeignKey(Location, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=0)
+    # Copy of product.reorder_level (synced by inventory.signals) so the low
+    # stock flag can be computed within the row
+    reorder_level = models.IntegerField(default=10, editable=False)
+    is_low = models.GeneratedField(
+        expression=models.Case(
+            models.When(quantity__lt=F('reorder_level'), then=models.Value(True)),
+            default=models.Value(False),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+
+    objects = ProductStockQuerySet.as_manager()
 
     class Meta:
+        # The unique constraint's (product, location) index serves the
+        # per-row stock lookups; the indexes below cover the other orders
         unique_together = ('product', 'location')
+        indexes = [
+            models.Index(fields=['location', 'product'], name='inv_stock_location_product_idx'),
+            models.Index(fields=['product', 'quantity'], name='inv_stock_product_qty_idx'),
+            models.Index(fields=['location', 'is_low'], name='inv_stock_location_low_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.name} @ {self.location.name}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.reorder_level = self.product.reorder_level
+        super().save(*args, **kwargs)
+
+class ItemTotalsQuerySet(models.QuerySet):
+    """QuerySet for documents with an ``items`` relation carrying a quantity"""
+
+    def _items_subquery(self, aggregate):
+        # A correlated subquery rather than a join, so filters on items
+        # elsewhere in the chain cannot multiply or trim the result
+        relation = self.model._meta.get_field('items')
+        parent = relation.field.name
+        return Subquery(
+            relation.related_model.objects.filter(**{parent: OuterRef('pk')})
+            .order_by().values(parent).annotate(value=aggregate).values('value')
+        )
+
+    def with_total_quantity(self):
+        """Annotate the summed item quantity read by get_total_quantity()"""
+        return self.annotate(_total_quantity=self._items_subquery(Sum('quantity')))
+
+    def with_item_totals(self):
+        """Annotate both values read by get_total_quantity() and get_items_count()"""
+        return self.with_total_quantity().annotate(
+            _items_count=Coalesce(self._items_subquery(Count('pk')), 0)
+        )
+
 class Purchase(models.Model):
     """Main purchase that can contain multiple products"""
     reference = models.CharField(max_length=20, unique=True, blank=True)
@@ -79,6 +225,13 @@ class Purchase(models.Model):
     purchase_date = models.DateTimeField(default=timezone.now)
     notes = models.TextField(blank=True, null=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+
+    objects = ItemTotalsQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['location', '-purchase_date'], name='inv_purchase_location_date_idx'),
+        ]
     
     def __str__(self):
         return f"PUR-{self.reference} - {self.supplier_name}"
@@ -89,9 +242,13 @@ class Purchase(models.Model):
         super().save(*args, **kwargs)
 
     def get_total_quantity(self):
+        if hasattr(self, '_total_quantity'):
+            return self._total_quantity or 0
         return self.items.aggregate(total=Sum('quantity'))['total'] or 0
 
     def get_items_count(self):
+        if hasattr(self, '_items_count'):
+            return self._items_count
         return self.items.count()
 
 class PurchaseItem(models.Model):
@@ -108,13 +265,16 @@ class PurchaseItem(models.Model):
         super().save(*args, **kwargs)
         # Update stock when purchase item is saved
         if self.purchase.location:
-            stock, created = ProductStock.objects.get_or_create(
+            stock, created = ProductStock.objects.only('id', 'quantity').get_or_create(
                 product=self.product,
                 location=self.purchase.location,
-                defaults={'quantity': 0}
+                defaults={'quantity': self.quantity}
             )
-            stock.quantity += self.quantity
-            stock.save()
+            if not created:
+                # Increment in SQL so concurrent purchases cannot overwrite each other
+                ProductStock.objects.filter(pk=stock.pk).update(
+                    quantity=F('quantity') + self.quantity
+                )
     
     def __str__(self):
         return f"{self.product.name} - {self.quantity} units"
@@ -122,11 +282,11 @@ class PurchaseItem(models.Model):
 class TransferBatch(models.Model):
     """Represents a group of stock transfers (like one transfer receipt)."""
     
-    STATUS_CHOICES = [
+    STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
         ('cancelled', 'Cancelled')
-    ]
+    )
     
     reference = models.CharField(max_length=20, unique=True)
     from_location = models.ForeignKey(
@@ -159,29 +319,82 @@ class TransferBatch(models.Model):
     notes = models.TextField(blank=True, null=True)
     transfer_date = models.DateTimeField(default=timezone.now)
 
+    objects = ItemTotalsQuerySet.as_manager()
+
     def get_total_quantity(self):
         """Get total quantity of all items in this batch"""
+        if hasattr(self, '_total_quantity'):
+            return self._total_quantity or 0
         return self.items.aggregate(total=Sum('quantity'))['total'] or 0
     
     def get_items_count(self):
         """Get number of items in this batch"""
+        if hasattr(self, '_items_count'):
+            return self._items_count
         return self.items.count()
 
     def __str__(self):
         return f"Batch {self.reference} - {self.status}"
 
     def confirm(self, user):
-        """Confirm all transfers in this batch"""
+        """Confirm all transfers in this batch.
+
+        Stock moves in a fixed number of queries however many items the
+        batch holds: a locked read and one CASE update for the source rows,
+        ProductStock.objects.add_quantities for the destination and one
+        status update.
+        """
         if self.status != 'pending':
             raise ValueError("Only pending batches can be confirmed.")
         
-        for transfer in self.items.all():
-            transfer.confirm_transfer(user)
+        if not self.from_location or not self.to_location:
+            raise ValueError("Batch locations are not set")
 
-        self.status = 'confirmed'
-        self.confirmed_by = user
-        self.confirmed_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            # The batch and its locations are already in hand, so only the
+            # product names (for error messages) are joined
+            transfers = list(
+                self.items.select_related(None).select_related('product')
+                .only('status', 'quantity', 'product__name')
+            )
+            if any(transfer.status != StockTransfer.PENDING for transfer in transfers):
+                raise ValueError("Only pending transfers can be confirmed")
+
+            # A product listed twice moves its combined quantity
+            requested = defaultdict(int)
+            products = {}
+            for transfer in transfers:
+                requested[transfer.product_id] += transfer.quantity
+                products[transfer.product_id] = transfer.product
+
+            if requested:
+                available = ProductStock.objects.locked_quantities(self.from_location, requested)
+
+                # Check stock at source
+                for product_id, quantity in requested.items():
+                    if product_id not in available:
+                        raise ValueError(
+                            f"No stock found for {products[product_id].name} at {self.from_location.name}"
+                        )
+                    if available[product_id] < quantity:
+                        raise ValueError(
+                            f"Not enough stock at {self.from_location.name}. "
+                            f"Available: {available[product_id]}, Requested: {quantity}"
+                        )
+
+                # Deduct from source and add to destination
+                ProductStock.objects.deduct_quantities(self.from_location, requested)
+
+                ProductStock.objects.add_quantities(self.to_location, requested)
+
+                self.items.filter(pk__in=[transfer.pk for transfer in transfers]).update(
+                    status=StockTransfer.CONFIRMED
+                )
+
+            self.status = 'confirmed'
+            self.confirmed_by = user
+            self.confirmed_at = timezone.now()
+            self.save()
 
     def cancel(self):
         """Cancel the entire batch"""
@@ -191,16 +404,23 @@ class TransferBatch(models.Model):
         self.status = 'cancelled'
         self.save()
 
+class StockTransferManager(models.Manager):
+    """Joins the batch locations and product that confirm_transfer and __str__ read"""
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'batch__from_location', 'batch__to_location', 'product'
+        )
+
 class StockTransfer(models.Model):
     """Each individual product transfer, linked to a batch."""
     PENDING = 'pending'
     CONFIRMED = 'confirmed'
     CANCELLED = 'cancelled'
-    STATUS_CHOICES = [
+    STATUS_CHOICES = (
         (PENDING, 'Pending'),
         (CONFIRMED, 'Confirmed'),
         (CANCELLED, 'Cancelled'),
-    ]
+    )
 
     batch = models.ForeignKey(
         TransferBatch, 
@@ -213,6 +433,8 @@ class StockTransfer(models.Model):
     transfer_date = models.DateTimeField(default=timezone.now)
     transferred_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = StockTransferManager()
+
     class Meta:
         ordering = ['-transfer_date']
 
@@ -229,30 +451,24 @@ class StockTransfer(models.Model):
         
         from_location = self.batch.from_location
         to_location = self.batch.to_location
-
-        # Check stock at source
-        try:
-            from_stock = ProductStock.objects.get(product=self.product, location=from_location)
-            if from_stock.quantity < self.quantity:
-                raise ValueError(f"Not enough stock at {from_location.name}. Available: {from_stock.quantity}, Requested: {self.quantity}")
-        except ProductStock.DoesNotExist:
-            raise ValueError(f"No stock found for {self.product.name} at {from_location.name}")
-
-        # Deduct from source and add to destination
-        from_stock.quantity -= self.quantity
-        from_stock.save()
-
-        to_stock, _ = ProductStock.objects.get_or_create(
-            product=self.product,
-            location=to_location,
-            defaults={'quantity': 0}
-        )
-        to_stock.quantity += self.quantity
-        to_stock.save()
-
-        # Mark as confirmed
-        self.status = self.CONFIRMED
-        self.save()
+        moved = {self.product_id: self.quantity}
+
+        with transaction.atomic():
+            # Check stock at source, holding the row lock until commit so a
+            # concurrent confirm cannot pass the same check
+            available = ProductStock.objects.locked_quantities(from_location, moved).get(self.product_id)
+            if available is None:
+                raise ValueError(f"No stock found for {self.product.name} at {from_location.name}")
+            if available < self.quantity:
+                raise ValueError(f"Not enough stock at {from_location.name}. Available: {available}, Requested: {self.quantity}")
+
+            # Deduct from source and add to destination
+            ProductStock.objects.deduct_quantities(from_location, moved)
+            ProductStock.objects.add_quantities(to_location, moved)
+
+            # Mark as confirmed
+            self.status = self.CONFIRMED
+            self.save()
 
     def cancel_transfer(self):
         """Cancel this individual transfer"""
@@ -269,6 +485,7 @@ class RetailStock(models.Model):
     quantity = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     class Meta:
+        # Also the index behind every (product, location) retail lookup
         unique_together = ('product', 'location')
 
     def __str__(self):
@@ -285,35 +502,53 @@ class RetailSale(models.Model):
     sold_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
     def save(self, *args, **kwargs):
-        # Calculate quantity based on amount given
-        self.quantity_given = self.amount_given / self.unit_price
+        # Calculate quantity based on amount given, rounded as the column
+        # stores it; 12 digits is ample for max_digits=12 operands
+        with localcontext() as ctx:
+            ctx.prec = 12
+            self.quantity_given = (
+                Decimal(self.amount_given) / Decimal(self.unit_price)
+            ).quantize(CENT, rounding=ROUND_HALF_UP)
 
         # Convert to integer for ProductStock (since it uses PositiveIntegerField)
         quantity_int = int(self.quantity_given)
         
-        # Deduct from main ProductStock
-        main_stock = ProductStock.objects.get(product=self.product, location=self.location)
-        if main_stock.quantity < quantity_int:
-            raise ValueError(f"Not enough stock in main inventory. Available: {main_stock.quantity}")
-        
-        main_stock.quantity -= quantity_int
-        main_stock.save()
+        with transaction.atomic():
+            # Deduct from main ProductStock; the quantity guard and the
+            # decrement are one UPDATE, so concurrent sales cannot oversell
+            main_stock = ProductStock.objects.filter(product=self.product, location=self.location)
+            if not main_stock.filter(quantity__gte=quantity_int).update(quantity=F('quantity') - quantity_int):
+                available = main_stock.values_list('quantity', flat=True).first()
+                if available is None:
+                    raise ProductStock.DoesNotExist("ProductStock matching query does not exist.")
+                raise ValueError(f"Not enough stock in main inventory. Available: {available}")
+
+            # Add to RetailStock (this uses DecimalField so no conversion needed)
+            retail_stock, created = RetailStock.objects.only('id', 'quantity').get_or_create(
+                product=self.product,
+                location=self.location,
+                defaults={'quantity': self.quantity_given},
+            )
+            if not created:
+                RetailStock.objects.filter(pk=retail_stock.pk).update(
+                    quantity=F('quantity') + self.quantity_given
+                )
 
-        # Add to RetailStock (this uses DecimalField so no conversion needed)
-        retail_stock, _ = RetailStock.objects.get_or_create(product=self.product, location=self.location)
-        retail_stock.quantity += self.quantity_given
-        retail_stock.save()
+            super().save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+class SaleManager(models.Manager):
+    """Joins the customer and location shown with every sale"""
+    def get_queryset(self):
+        return super().get_queryset().select_related('customer', 'location')
 
 class Sale(models.Model):
-    DOCUMENT_STATUS = [
+    DOCUMENT_STATUS = (
         ('draft', 'Draft'),
         ('sent', 'Sent'),
         ('paid', 'Paid'),
         ('overdue', 'Overdue'),
         ('cancelled', 'Cancelled'),
-    ]
+    )
     
     customer = models.ForeignKey('transactions.Customer', on_delete=models.SET_NULL, null=True, blank=True)
     location = models.ForeignKey('core.Location', on_delete=models.SET_NULL, null=True)
@@ -328,6 +563,8 @@ class Sale(models.Model):
         default=DocumentType.INVOICE
     )
     document_number = models.CharField(max_length=50, unique=True, blank=True)
+    # Numeric part of document_number, so sequences never parse strings
+    document_seq = models.PositiveIntegerField(null=True, blank=True, editable=False)
     document_status = models.CharField(
         max_length=20, 
         choices=DOCUMENT_STATUS, 
@@ -347,34 +584,55 @@ class Sale(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SaleManager()
+
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['location', '-date'], name='inv_sale_location_date_idx'),
+            # Sales reports filter on document_status='sent' and order by date
+            models.Index(fields=['document_status', '-date'], name='inv_sale_status_date_idx'),
+            models.Index(fields=['document_type', 'document_seq'], name='inv_sale_type_seq_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         # Generate document number if not set
         if not self.document_number:
             prefix = self.document_type.upper()[:3]
-            last_doc = Sale.objects.filter(document_type=self.document_type).order_by('-id').first()
-            next_number = 1 if not last_doc else int(last_doc.document_number.split('-')[-1]) + 1
-            self.document_number = f"{prefix}-{timezone.now().year}-{next_number:06d}"
+            self.document_seq = DocumentCounter.next_number(self.document_type)
+            self.document_number = f"{prefix}-{timezone.now().year}-{self.document_seq:06d}"
         
         super().save(*args, **kwargs)
+        # Views assign paid_amount / total_amount and then save
+        self._clear_payment_cache()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._clear_payment_cache()
 
     def __str__(self):
         customer_name = self.customer.name if self.customer else 'Walk-in'
         return f"{self.document_number} - {customer_name} - ${self.total_amount}"
 
-    @property
+    # Memoized per instance; code that changes total_amount, paid_amount or
+    # due_date calls _clear_payment_cache() (save and refresh_from_db do)
+    PAYMENT_CACHED_PROPERTIES = ('balance_due', 'is_overdue', 'payment_status', 'is_fully_paid')
+
+    def _clear_payment_cache(self):
+        for prop in self.PAYMENT_CACHED_PROPERTIES:
+            self.__dict__.pop(prop, None)
+
+    @cached_property
     def balance_due(self):
         return self.total_amount - self.paid_amount
 
-    @property
+    @cached_property
     def is_overdue(self):
         if self.due_date and self.balance_due > 0:
             return timezone.now().date() > self.due_date
         return False
 
-    @property
+    @cached_property
     def payment_status(self):
         """Calculate payment status based on paid amount"""
         if self.paid_amount >= self.total_amount:
@@ -384,7 +642,7 @@ class Sale(models.Model):
         else:
             return 'not_paid'
     
-    @property 
+    @cached_property
     def is_fully_paid(self):
         """Check if sale is fully paid"""
         return self.balance_due <= 0
@@ -398,6 +656,42 @@ class Sale(models.Model):
             self.document_status = 'sent'
         self.save()
 
+    def recalculate_total(self):
+        """Recompute total_amount from the items, e.g. after SaleItem.objects.bulk_create"""
+        self.total_amount = self.items.aggregate(total=Sum('total_price', default=0))['total']
+        Sale.objects.filter(pk=self.pk).update(total_amount=self.total_amount)
+        self._clear_payment_cache()
+
+class DocumentCounter(models.Model):
+    """Last number handed out per document type, for Sale.document_number"""
+    document_type = models.CharField(max_length=20, choices=DocumentType.choices, unique=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.document_type}: {self.last_number}"
+
+    @classmethod
+    def next_number(cls, document_type):
+        """Claim the next number for ``document_type``.
+
+        The increment is a single UPDATE, so concurrent saves are serialized
+        on the counter row instead of both reading the same last document.
+        """
+        with transaction.atomic():
+            counter = cls.objects.filter(document_type=document_type)
+            if not counter.update(last_number=F('last_number') + 1):
+                # First use: continue from the highest existing document
+                start = Sale.objects.filter(
+                    document_type=document_type
+                ).aggregate(last=Max('document_seq'))['last'] or 0
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(document_type=document_type, last_number=start + 1)
+                except IntegrityError:
+                    # Another request seeded it first
+                    counter.update(last_number=F('last_number') + 1)
+            return counter.values_list('last_number', flat=True).get()
+
 class SaleItem(models.Model):
     sale = models.ForeignKey(Sale, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -408,28 +702,47 @@ class SaleItem(models.Model):
     class Meta:
         ordering = ['id']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored line total so save() can apply just the change
+        instance._loaded_total_price = instance.__dict__.get('total_price')
+        return instance
+
     def save(self, *args, **kwargs):
-        # Calculate total price
-        self.total_price = self.quantity * self.unit_price
+        # Calculate total price, rounded as the column stores it (views may
+        # pass a float unit_price)
+        self.total_price = self._meta.get_field('total_price').to_python(
+            self.quantity * self.unit_price
+        ).quantize(CENT, rounding=ROUND_HALF_UP)
+        previous = Decimal('0') if self._state.adding else getattr(self, '_loaded_total_price', None)
         super().save(*args, **kwargs)
         
-        # Update sale total (but don't handle stock here anymore)
-        if self.sale.pk:
-            self.sale.total_amount = sum(item.total_price for item in self.sale.items.all())
-            self.sale.save()
+        # Update sale total (but don't handle stock here anymore) by this
+        # line's change only, without reloading the sibling items
+        if previous is None:
+            self.sale.recalculate_total()
+        else:
+            delta = self.total_price - previous
+            if delta:
+                Sale.objects.filter(pk=self.sale_id).update(total_amount=F('total_amount') + delta)
+                if SaleItem.sale.is_cached(self):
+                    self.sale.total_amount = Decimal(str(self.sale.total_amount)) + delta
+                    self.sale._clear_payment_cache()
+        self._loaded_total_price = self.total_price
 
     def __str__(self):
         return f"{self.product.name} - {self.quantity} x ${self.unit_price}"
 
 class Payment(models.Model):
-    PAYMENT_METHODS = [
+    PAYMENT_METHODS = (
         ('cash', 'Cash'),
         ('bank_transfer', 'Bank Transfer'),
         ('credit_card', 'Credit Card'),
         ('mobile_money', 'Mobile Money'),
         ('check', 'Check'),
         ('other', 'Other'),
-    ]
+    )
     
     sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -443,29 +756,50 @@ class Payment(models.Model):
     def __str__(self):
         return f"Payment of {self.amount} for {self.sale.document_number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored amount so save() can apply just the change
+        instance._loaded_amount = instance.__dict__.get('amount')
+        return instance
+
     def save(self, *args, **kwargs):
+        self.amount = self._meta.get_field('amount').to_python(self.amount)
+        previous = Decimal('0') if self._state.adding else getattr(self, '_loaded_amount', None)
         super().save(*args, **kwargs)
-        # Update sale's paid amount
-        self.sale.paid_amount = sum(payment.amount for payment in self.sale.payments.all())
-        
-        # Update sale status based on payment
-        if self.sale.paid_amount >= self.sale.total_amount:
-            self.sale.document_status = 'paid'
-        elif self.sale.paid_amount > 0:
-            self.sale.document_status = 'sent'
-        elif self.sale.document_status == 'paid' and self.sale.paid_amount < self.sale.total_amount:
-            self.sale.document_status = 'sent'
-        
-        self.sale.save()
+        self._loaded_amount = self.amount
+
+        if previous is None:
+            # Unknown earlier amount (deferred field): recount from scratch
+            paid_amount = Value(
+                self.sale.payments.aggregate(total=Sum('amount', default=0))['total'],
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            )
+        else:
+            paid_amount = F('paid_amount') + (self.amount - previous)
+
+        # Update sale's paid amount and status based on payment in a single
+        # UPDATE; every F() in it reads the row as it was before the update
+        Sale.objects.filter(pk=self.sale_id).update(
+            paid_amount=paid_amount,
+            document_status=Case(
+                When(LessThanOrEqual(F('total_amount'), paid_amount), then=Value('paid')),
+                When(GreaterThan(paid_amount, 0), then=Value('sent')),
+                When(document_status='paid', then=Value('sent')),
+                default=F('document_status'),
+            ),
+        )
+        if Payment.sale.is_cached(self):
+            self.sale.refresh_from_db(fields=['paid_amount', 'document_status'])
 
 class PurchaseOrder(models.Model):
     """Main purchase order that can contain multiple products"""
-    STATUS_CHOICES = [
+    STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('ordered', 'Ordered'),
         ('received', 'Received'),
         ('cancelled', 'Cancelled'),
-    ]
+    )
     
     reference = models.CharField(max_length=20, unique=True)
     supplier_name = models.CharField(max_length=200)
@@ -479,6 +813,8 @@ class PurchaseOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ItemTotalsQuerySet.as_manager()
+
     def __str__(self):
         return f"PO-{self.reference} - {self.supplier_name}"
 
@@ -488,9 +824,13 @@ class PurchaseOrder(models.Model):
         super().save(*args, **kwargs)
 
     def get_total_quantity(self):
+        if hasattr(self, '_total_quantity'):
+            return self._total_quantity or 0
         return self.items.aggregate(total=Sum('quantity'))['total'] or 0
 
     def get_items_count(self):
+        if hasattr(self, '_items_count'):
+            return self._items_count
         return self.items.count()
 
     def mark_received(self):
@@ -498,18 +838,16 @@ class PurchaseOrder(models.Model):
         if self.status != 'ordered':
             raise ValueError("Only ordered purchases can be marked as received")
         
-        for item in self.items.all():
+        with transaction.atomic():
             if self.location:
-                stock, created = ProductStock.objects.get_or_create(
-                    product=item.product,
-                    location=self.location,
-                    defaults={'quantity': 0}
-                )
-                stock.quantity += item.quantity
-                stock.save()
-        
-        self.status = 'received'
-        self.save()
+                # A product listed twice receives its combined quantity
+                received = defaultdict(int)
+                for product_id, quantity in self.items.values_list('product_id', 'quantity'):
+                    received[product_id] += quantity
+                ProductStock.objects.add_quantities(self.location, received)
+            
+            self.status = 'received'
+            self.save()
 
 class PurchaseOrderItem(models.Model):
     """Individual items within a purchase order"""
@@ -526,12 +864,12 @@ class PurchaseOrderItem(models.Model):
 
 class SaleOrder(models.Model):
     """Main sale order that can contain multiple products"""
-    STATUS_CHOICES = [
+    STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('confirmed', 'Confirmed'),
         ('delivered', 'Delivered'),
         ('cancelled', 'Cancelled'),
-    ]
+    )
     
     reference = models.CharField(max_length=20, unique=True)
     customer = models.ForeignKey('transactions.Customer', on_delete=models.SET_NULL, null=True, blank=True)
@@ -544,6 +882,8 @@ class SaleOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ItemTotalsQuerySet.as_manager()
+
     def __str__(self):
         customer_name = self.customer.name if self.customer else 'Walk-in'
         return f"SO-{self.reference} - {customer_name}"
@@ -554,9 +894,13 @@ class SaleOrder(models.Model):
         super().save(*args, **kwargs)
 
     def get_total_quantity(self):
+        if hasattr(self, '_total_quantity'):
+            return self._total_quantity or 0
         return self.items.aggregate(total=Sum('quantity'))['total'] or 0
 
     def get_items_count(self):
+        if hasattr(self, '_items_count'):
+            return self._items_count
         return self.items.count()
 
     def confirm_order(self):
@@ -564,31 +908,30 @@ class SaleOrder(models.Model):
         if self.status != 'draft':
             raise ValueError("Only draft sales can be confirmed")
         
-        # Check stock availability first
-        for item in self.items.all():
-            if self.location:
-                try:
-                    stock = ProductStock.objects.get(
-                        product=item.product,
-                        location=self.location
-                    )
-                    if stock.quantity < item.quantity:
-                        raise ValueError(f"Not enough stock for {item.product.name}. Available: {stock.quantity}, Requested: {item.quantity}")
-                except ProductStock.DoesNotExist:
-                    raise ValueError(f"No stock found for {item.product.name} at {self.location.name}")
-        
-        # Deduct stock
-        for item in self.items.all():
+        with transaction.atomic():
             if self.location:
-                stock = ProductStock.objects.get(
-                    product=item.product,
-                    location=self.location
-                )
-                stock.quantity -= item.quantity
-                stock.save()
-        
-        self.status = 'confirmed'
-        self.save()
+                items = list(self.items.select_related('product'))
+                # A product listed twice is checked and deducted in total
+                requested = defaultdict(int)
+                for item in items:
+                    requested[item.product_id] += item.quantity
+                available = ProductStock.objects.locked_quantities(self.location, requested)
+
+                # Check stock availability first
+                for item in items:
+                    if item.product_id not in available:
+                        raise ValueError(f"No stock found for {item.product.name} at {self.location.name}")
+                    if available[item.product_id] < requested[item.product_id]:
+                        raise ValueError(
+                            f"Not enough stock for {item.product.name}. "
+                            f"Available: {available[item.product_id]}, Requested: {requested[item.product_id]}"
+                        )
+
+                # Deduct stock
+                ProductStock.objects.deduct_quantities(self.location, requested)
+            
+            self.status = 'confirmed'
+            self.save(update_fields=['status', 'updated_at'])
 
 class SaleOrderItem(models.Model):
     """Individual items within a sale order"""
@@ -636,37 +979,32 @@ class CompanyDetails(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        # Ensure only one company details record exists
-        if not self.pk and CompanyDetails.objects.exists():
-            # Update the existing record instead of creating new one
-            existing = CompanyDetails.objects.first()
-            existing.name = self.name
-            existing.address = self.address
-            existing.phone = self.phone
-            existing.email = self.email
-            existing.website = self.website
-            existing.logo = self.logo
-            existing.tax_id = self.tax_id
-            existing.bank_name = self.bank_name
-            existing.bank_account = self.bank_account
-            existing.bank_branch = self.bank_branch
-            existing.invoice_prefix = self.invoice_prefix
-            existing.quotation_prefix = self.quotation_prefix
-            existing.receipt_prefix = self.receipt_prefix
-            existing.invoice_footer = self.invoice_footer
-            existing.quotation_footer = self.quotation_footer
-            existing.save()
-            return
+        # Ensure only one company details record exists: every save targets
+        # pk=1, which Django writes as a single UPDATE (INSERT the first time)
+        self.pk = 1
         super().save(*args, **kwargs)
 
+    @classmethod
+    def get_solo(cls):
+        """The company details row, created with placeholder values if missing"""
+        return cls.objects.get_or_create(
+            pk=1,
+            defaults={
+                'name': 'Teba Inventory',
+                'address': 'Your company address here',
+                'phone': '+255 XXX XXX XXX',
+                'email': 'info@teba.com',
+            },
+        )[0]
+
 
 class StockTake(models.Model):
-    STATUS_CHOICES = [
+    STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('in_progress', 'In Progress'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
-    ]
+    )
 
     reference = models.CharField(max_length=50, unique=True)
     location = models.ForeignKey(Location, on_delete=models.CASCADE)
@@ -698,22 +1036,31 @@ class StockTake(models.Model):
     def complete_stocktake(self):
         """Complete the stocktake and update actual stock quantities"""
         if self.status != 'completed':
-            self.status = 'completed'
-            self.completed_date = timezone.now()
-            self.save()
-
-            # Update actual stock quantities
-            for item in self.items.all():
-                if item.quantity_counted is not None:
-                    # Update the product stock
-                    stock, created = ProductStock.objects.get_or_create(
-                        product=item.product,
-                        location=self.location,
-                        defaults={'quantity': item.quantity_counted}
-                    )
-                    if not created:
-                        stock.quantity = item.quantity_counted
-                        stock.save()
+            with transaction.atomic():
+                self.status = 'completed'
+                self.completed_date = timezone.now()
+                self.save()
+
+                # Update actual stock quantities in one upsert; reorder_level
+                # only applies to newly inserted rows (bulk_create skips save())
+                counted = self.items.filter(quantity_counted__isnull=False).values_list(
+                    'product_id', 'quantity_counted', 'product__reorder_level'
+                )
+                ProductStock.objects.bulk_create(
+                    [
+                        ProductStock(
+                            product_id=product_id,
+                            location=self.location,
+                            quantity=quantity_counted,
+                            reorder_level=reorder_level,
+                        )
+                        for product_id, quantity_counted, reorder_level in counted
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['product', 'location'],
+                    update_fields=['quantity'],
+                    batch_size=500,
+                )
 
 
 class StockTakeItem(models.Model):
@@ -721,19 +1068,22 @@ class StockTakeItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity_on_hand = models.IntegerField(default=0)  # System quantity before stocktake
     quantity_counted = models.IntegerField(null=True, blank=True)  # Physical count
-    variance = models.IntegerField(default=0)  # difference: counted - on_hand
+    # difference: counted - on_hand, computed by the database (0 until counted)
+    variance = models.GeneratedField(
+        expression=Coalesce(F('quantity_counted') - F('quantity_on_hand'), Value(0)),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
     notes = models.TextField(blank=True)
     counted_at = models.DateTimeField(null=True, blank=True)
     counted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
     class Meta:
         unique_together = ['stock_take', 'product']
-
-    def save(self, *args, **kwargs):
-        # Calculate variance
-        if self.quantity_counted is not None and self.quantity_on_hand is not None:
-            self.variance = self.quantity_counted - self.quantity_on_hand
-        super().save(*args, **kwargs)
+        indexes = [
+            # Counted/uncounted tallies per stock take are answered from the index
+            models.Index(fields=['stock_take', 'quantity_counted'], name='inv_stocktakeitem_counted_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {self.quantity_counted}"      
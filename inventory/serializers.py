@@ -1,8 +1,19 @@
+from functools import cached_property
 from rest_framework import serializers
 from .models import *
 from transactions.models import Customer
 from core.models import Location
 
+class CachedReadableFieldsMixin:
+    """Build the readable field list once per serializer instance.
+
+    A ``many=True`` serializer reuses one child instance for every row, so
+    this skips re-filtering write-only fields on each to_representation().
+    """
+    @cached_property
+    def _readable_fields(self):
+        return [field for field in self.fields.values() if not field.write_only]
+
 class CategorySerializer(serializers.ModelSerializer):
     # Remove product_count since it's not in the model
     class Meta:
@@ -15,7 +26,8 @@ class SupplierSerializer(serializers.ModelSerializer):
         model = Supplier
         fields = '__all__'
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
+    """Serialize Product.objects.with_stock() rows, which carry both stock fields"""
     category_name = serializers.CharField(source='category.name', read_only=True)
     total_stock = serializers.IntegerField(read_only=True)
     stock_status = serializers.CharField(read_only=True)
@@ -28,7 +40,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'total_stock', 'stock_status', 'created_at'
         ]
 
-class ProductStockSerializer(serializers.ModelSerializer):
+class ProductStockSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     location_name = serializers.CharField(source='location.name', read_only=True)
     
@@ -36,7 +48,7 @@ class ProductStockSerializer(serializers.ModelSerializer):
         model = ProductStock
         fields = '__all__'
 
-class SaleItemSerializer(serializers.ModelSerializer):
+class SaleItemSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
@@ -44,7 +56,7 @@ class SaleItemSerializer(serializers.ModelSerializer):
         model = SaleItem
         fields = '__all__'
 
-class SaleSerializer(serializers.ModelSerializer):
+class SaleSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     location_name = serializers.CharField(source='location.name', read_only=True)
     items = SaleItemSerializer(many=True, read_only=True)
@@ -55,7 +67,7 @@ class SaleSerializer(serializers.ModelSerializer):
         model = Sale
         fields = '__all__'
 
-class PurchaseItemSerializer(serializers.ModelSerializer):
+class PurchaseItemSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     total_cost = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
@@ -63,7 +75,7 @@ class PurchaseItemSerializer(serializers.ModelSerializer):
         model = PurchaseItem
         fields = '__all__'
 
-class PurchaseSerializer(serializers.ModelSerializer):
+class PurchaseSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     location_name = serializers.CharField(source='location.name', read_only=True)
     items = PurchaseItemSerializer(many=True, read_only=True)
     total_quantity = serializers.IntegerField(read_only=True)
@@ -72,7 +84,7 @@ class PurchaseSerializer(serializers.ModelSerializer):
         model = Purchase
         fields = '__all__'
 
-class PurchaseOrderItemSerializer(serializers.ModelSerializer):
+class PurchaseOrderItemSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     total_cost = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
@@ -80,7 +92,7 @@ class PurchaseOrderItemSerializer(serializers.ModelSerializer):
         model = PurchaseOrderItem
         fields = '__all__'
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     location_name = serializers.CharField(source='location.name', read_only=True)
     items = PurchaseOrderItemSerializer(many=True, read_only=True)
     
@@ -88,7 +100,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         model = PurchaseOrder
         fields = '__all__'
 
-class SaleOrderItemSerializer(serializers.ModelSerializer):
+class SaleOrderItemSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
@@ -96,7 +108,7 @@ class SaleOrderItemSerializer(serializers.ModelSerializer):
         model = SaleOrderItem
         fields = '__all__'
 
-class SaleOrderSerializer(serializers.ModelSerializer):
+class SaleOrderSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     location_name = serializers.CharField(source='location.name', read_only=True)
     items = SaleOrderItemSerializer(many=True, read_only=True)
@@ -112,18 +124,18 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = '__all__'
 
-class StockTransferSerializer(serializers.ModelSerializer):
+class StockTransferSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     
     class Meta:
         model = StockTransfer
         fields = '__all__'
 
-class TransferBatchSerializer(serializers.ModelSerializer):
+class TransferBatchSerializer(CachedReadableFieldsMixin, serializers.ModelSerializer):
     from_location_name = serializers.CharField(source='from_location.name', read_only=True)
     to_location_name = serializers.CharField(source='to_location.name', read_only=True)
     items = StockTransferSerializer(many=True, read_only=True)
     
     class Meta:
         model = TransferBatch
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
@@ -0,0 +1,40 @@
+# inventory/signals.py
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.core.cache import cache
+from django.dispatch import receiver
+from django.utils import timezone
+from core.utils import clear_dashboard_stats_cache
+from .models import CATEGORY_LIST_CACHE_KEY, Category, Payment, Product, ProductStock, Purchase, PurchaseItem, Sale, SaleItem
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Sale)
+@receiver([post_save, post_delete], sender=SaleItem)
+@receiver([post_save, post_delete], sender=Purchase)
+@receiver([post_save, post_delete], sender=PurchaseItem)
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_dashboard_stats(sender, **kwargs):
+    """Drop cached dashboard totals whenever the documents behind them change"""
+    clear_dashboard_stats_cache()
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_list(sender, **kwargs):
+    """Drop the cached category filter list when a category changes"""
+    cache.delete(CATEGORY_LIST_CACHE_KEY)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_products(sender, instance, **kwargs):
+    """Stamp a category's products so catalog ETags pick up renames and removals"""
+    Product.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Product)
+def sync_stock_reorder_level(sender, instance, created, **kwargs):
+    """Copy the product's reorder level onto its stock rows for ProductStock.is_low"""
+    if not created:
+        ProductStock.objects.filter(product=instance).exclude(
+            reorder_level=instance.reorder_level
+        ).update(reorder_level=instance.reorder_level)
@@ -1,24 +1,21 @@
 # inventory/templatetags/inventory_filters.py
 from django import template
+from django.http import QueryDict
 
 register = template.Library()
 
 @register.filter
 def dict_key(dictionary, key):
     """Get a value from a dictionary by key"""
+    if isinstance(dictionary, dict):
+        return dictionary.get(key)
+    # Other containers (e.g. querysets in templates) keep the membership check
     if dictionary and key in dictionary:
         return dictionary[key]
     return None
 
-@register.filter
-def get_item(dictionary, key):
-    """Get a value from a dictionary by key (alternative name)"""
-    return dict_key(dictionary, key)
-
-
-    from django import template
-
-register = template.Library()
+# Alternative name, registered directly rather than through a wrapper
+register.filter('get_item', dict_key)
 
 @register.filter
 def mul(value, arg):
@@ -28,10 +25,6 @@ def mul(value, arg):
     except (ValueError, TypeError):
         return 0
 
-from django import template
-
-register = template.Library()
-
 @register.filter
 def remove_param(query_string, param_name):
     """
@@ -41,9 +34,9 @@ def remove_param(query_string, param_name):
     if not query_string:
         return ''
     
-    params = query_string.split('&')
-    filtered_params = [p for p in params if not p.startswith(f'{param_name}=')]
-    return '&'.join(filtered_params)
+    params = QueryDict(query_string, mutable=True)
+    params.pop(param_name, None)
+    return params.urlencode()
 
 @register.filter
 def subtract(value, arg):
@@ -51,4 +44,4 @@ def subtract(value, arg):
     try:
         return float(value) - float(arg)
     except (ValueError, TypeError):
-        return 0
\ No newline at end of file
+        return 0
@@ -5,21 +5,15 @@ register = template.Library()
 @register.simple_tag
 def param_remove(request, param_name):
     """Remove a parameter from the current query string"""
-    from django.http import QueryDict
-    from urllib.parse import urlencode
-    
-    query_dict = QueryDict(mutable=True)
-    query_dict.update({key: value for key, value in request.GET.items() if key != param_name})
-    return urlencode(query_dict)
+    # copy() clones every value of multi-valued params in one step
+    query_dict = request.GET.copy()
+    query_dict.pop(param_name, None)
+    return query_dict.urlencode()
 
 @register.simple_tag
 def param_replace(request, **kwargs):
     """Replace or add parameters in the current query string"""
-    from django.http import QueryDict
-    from urllib.parse import urlencode
-    
-    query_dict = QueryDict(mutable=True)
-    query_dict.update(request.GET)
+    query_dict = request.GET.copy()
     
     for key, value in kwargs.items():
         if value is not None:
@@ -27,4 +21,4 @@ def param_replace(request, **kwargs):
         else:
             query_dict.pop(key, None)
     
-    return urlencode(query_dict)
\ No newline at end of file
+    return query_dict.urlencode()
@@ -1,3 +1,102 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Location
+from .models import Category, Product, ProductStock, Purchase, PurchaseItem
+
+
+class InventoryViewTestCase(TestCase):
+    """Logged-in admin with one stocked product, requests run the full middleware stack"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name='Main Store')
+        cls.user = User.objects.create_user('admin', password='secret')
+        # core.signals creates the profile and re-saves the cached instance
+        # on every user save (force_login stamps last_login), so the role
+        # must be set on that instance rather than with a queryset update
+        profile = cls.user.profile
+        profile.role = 'admin'
+        profile.can_manage_inventory = True
+        profile.save()
+        category = Category.objects.create(name='Paint')
+        cls.product = Product.objects.create(
+            category=category, name='Gloss White', sku='GW-1',
+            cost_price=10, selling_price=15,
+        )
+        ProductStock.objects.create(product=cls.product, location=cls.location, quantity=5)
+
+    def setUp(self):
+        # User locations are cached by user id, which the next test may reuse
+        cache.clear()
+        self.client.force_login(self.user)
+
+
+class InventoryDashboardTests(InventoryViewTestCase):
+    def test_dashboard_renders_with_location_context(self):
+        response = self.client.get(reverse('inventory:dashboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user_location_ids, (self.location.id,))
+
+
+class LocationFilteredViewTests(InventoryViewTestCase):
+    """Views filtering on request.user_location_ids render instead of erroring"""
+
+    def test_product_list(self):
+        response = self.client.get(reverse('inventory:product_list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Gloss White')
+
+    def test_product_detail(self):
+        response = self.client.get(reverse('inventory:product_detail', args=[self.product.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['current_stock'], 5)
+
+    def test_product_edit_form(self):
+        # Errors inside the view redirect back to the list, so expect the form
+        response = self.client.get(reverse('inventory:product_edit', args=[self.product.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stocks'], {self.location.id: 5})
+
+    def test_product_delete(self):
+        response = self.client.post(reverse('inventory:product_delete', args=[self.product.id]))
+
+        self.assertRedirects(response, reverse('inventory:product_list'), fetch_redirect_response=False)
+        self.assertFalse(Product.objects.filter(id=self.product.id).exists())
+
+    def test_purchase_list(self):
+        purchase = Purchase.objects.create(
+            supplier_name='Acme', location=self.location, total_amount=30, created_by=self.user,
+        )
+        PurchaseItem.objects.create(purchase=purchase, product=self.product, quantity=3, unit_price=10)
+
+        response = self.client.get(reverse('inventory:purchase_list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_quantity'], 3)
+        self.assertEqual(response.context['unique_suppliers'], 1)
+
+    def test_purchase_add_increments_stock(self):
+        new_product = Product.objects.create(name='Matt Black', sku='MB-1', cost_price=8, selling_price=12)
+        items = [
+            {'product_id': 'not-an-id', 'quantity': 2, 'unit_price': 5},
+            {'product_id': self.product.id, 'quantity': 3, 'unit_price': 10},
+            {'product_id': new_product.id, 'quantity': 4, 'unit_price': 8},
+        ]
+
+        response = self.client.post(reverse('inventory:purchase_add'), {
+            'supplier_name': 'Acme', 'location': self.location.id, 'items_data': json.dumps(items),
+        })
 
-# Create your tests here.
+        self.assertRedirects(response, reverse('inventory:purchase_list'), fetch_redirect_response=False)
+        self.assertEqual(Purchase.objects.get().items.count(), 2)
+        self.assertEqual(ProductStock.objects.get(product=self.product).quantity, 8)
+        self.assertEqual(ProductStock.objects.get(product=new_product).quantity, 4)
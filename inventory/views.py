@@ -5,23 +5,27 @@ from .models import StockTake, StockTakeItem  # For stocktake functionality
 from django.core.paginator import Paginator
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, condition
 from django.db import models
 from django.db.models import Sum, Q, F
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.db import transaction
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 import uuid
 import csv
 import json
+import hashlib
 from django.db.models import (
     Sum, Count, Avg, Min, Max, F, Q, Value, When, Case, 
-    IntegerField, DecimalField, FloatField, ExpressionWrapper
+    IntegerField, DecimalField, FloatField, ExpressionWrapper,
+    Exists, OuterRef, Subquery
 )
+from django.db.models.functions import Coalesce
 
 from .models import (
-    Category, Product, ProductStock, Purchase, PurchaseItem, Supplier,
+    CATEGORY_LIST_CACHE_KEY, Category, Product, ProductStock, Purchase, PurchaseItem, Supplier,
     Sale, SaleItem, StockTransfer, TransferBatch, RetailStock, 
     RetailSale, Currency, Payment, PurchaseOrder, PurchaseOrderItem, 
     SaleOrder, SaleOrderItem, DocumentType, CompanyDetails, StockTake, StockTakeItem 
@@ -32,6 +36,7 @@ from .forms import SaleForm, PaymentForm
 
 # Import location utilities
 from core.utils import get_user_locations, filter_queryset_by_user_locations, can_user_access_location, get_user_default_location
+from core.utils import get_dashboard_stats_cache_key, clear_dashboard_stats_cache, DASHBOARD_STATS_TIMEOUT, approx_count
 
 
 # =======================
@@ -40,59 +45,65 @@ from core.utils import get_user_locations, filter_queryset_by_user_locations, ca
 @login_required
 def inventory_dashboard(request):
     """Inventory Dashboard"""
-    try:
-        # Get total products count
-        total_products = Product.objects.count()
-        
-        # Get total sales amount (filtered by user locations)
-        sales = Sale.objects.all()
-        sales = filter_queryset_by_user_locations(sales, request.user)
-        total_sales_amount = sales.aggregate(total=Sum('total_amount'))['total'] or 0
-        
-        # Get total purchases amount (filtered by user locations)
-        purchases = Purchase.objects.all()
-        purchases = filter_queryset_by_user_locations(purchases, request.user)
-        total_purchases_amount = purchases.aggregate(total=Sum('total_amount'))['total'] or 0
-        
-        # Get total quantity sold (from SaleItem model)
-        sale_items = SaleItem.objects.filter(sale__in=sales)
-        total_quantity_sold = sale_items.aggregate(total=Sum('quantity'))['total'] or 0
-        
-        # Get low stock products (filtered by user locations)
-        low_stock_products = Product.objects.filter(
-            stocks__quantity__lt=10,
-            stocks__location__in=get_user_locations(request.user)
-        ).distinct()[:5]
-        
-        # Get recent sales (filtered by user locations)
-        recent_sales = sales.select_related('customer', 'location').order_by('-date')[:5]
-        
-        # Get recent purchases (filtered by user locations)
-        recent_purchases = purchases.select_related('location').order_by('-purchase_date')[:5]
-        
-        context = {
-            'total_products': total_products,
-            'total_sales_amount': total_sales_amount,
-            'total_purchases_amount': total_purchases_amount,
-            'total_quantity_sold': total_quantity_sold,
-            'low_stock_products': low_stock_products,
-            'recent_sales': recent_sales,
-            'recent_purchases': recent_purchases,
-        }
-        return render(request, 'inventory/dashboard.html', context)
-        
-    except Exception as e:
-        # Fallback if there are any issues
-        context = {
-            'total_products': 0,
-            'total_sales_amount': 0,
-            'total_purchases_amount': 0,
-            'total_quantity_sold': 0,
-            'low_stock_products': [],
-            'recent_sales': [],
-            'recent_purchases': [],
+    # Resolved once per request by LocationContextMiddleware; every query
+    # below filters on these literal ids
+    user_location_ids = request.user_location_ids
+    sales = Sale.objects.filter(location_id__in=user_location_ids)
+    purchases = Purchase.objects.filter(location_id__in=user_location_ids)
+    
+    # The headline totals scan every sale and purchase in the user's
+    # locations, so they are cached briefly per user and location set
+    stats_cache_key = get_dashboard_stats_cache_key(request.user)
+    stats = cache.get(stats_cache_key)
+    if stats is None:
+        # Get total sales amount and quantity sold in one query; quantity
+        # comes from a per-sale subquery so the items join cannot inflate
+        # the amount total. default=0 covers locations with no rows yet.
+        sold_quantity = SaleItem.objects.filter(
+            sale=OuterRef('pk')
+        ).order_by().values('sale').annotate(total=Sum('quantity')).values('total')
+        sales_totals = sales.annotate(sold_quantity=Subquery(sold_quantity)).aggregate(
+            amount=Sum('total_amount', default=0),
+            quantity=Sum('sold_quantity', default=0),
+        )
+        stats = {
+            'total_products': approx_count(Product.objects.all()),
+            'total_sales_amount': sales_totals['amount'],
+            'total_purchases_amount': purchases.aggregate(total=Sum('total_amount', default=0))['total'],
+            'total_quantity_sold': sales_totals['quantity'],
         }
-        return render(request, 'inventory/dashboard.html', context)
+        cache.set(stats_cache_key, stats, DASHBOARD_STATS_TIMEOUT)
+    
+    # Get low stock products (filtered by user locations): stock summed
+    # over the user's locations in a per-product subquery, which also
+    # supplies the quantity the template shows without a query per row
+    location_stock = ProductStock.objects.filter(
+        product=OuterRef('pk'),
+        location_id__in=user_location_ids,
+    ).order_by().values('product').annotate(total=Sum('quantity')).values('total')
+    low_stock_products = Product.objects.annotate(
+        stock_quantity=Subquery(location_stock)
+    ).filter(stock_quantity__lt=10).order_by('stock_quantity')[:5]
+    
+    # Get recent sales (filtered by user locations); only the columns the
+    # dashboard shows, so notes/terms text is never fetched. select_related
+    # is reset first because Sale.objects also joins the location.
+    recent_sales = sales.select_related(None).select_related('customer').only(
+        'document_number', 'date', 'total_amount', 'customer__name'
+    ).order_by('-date')[:5]
+    
+    # Get recent purchases (filtered by user locations)
+    recent_purchases = purchases.select_related('location').only(
+        'reference', 'supplier_name', 'total_amount', 'purchase_date', 'location__name'
+    ).order_by('-purchase_date')[:5]
+    
+    context = {
+        **stats,
+        'low_stock_products': low_stock_products,
+        'recent_sales': recent_sales,
+        'recent_purchases': recent_purchases,
+    }
+    return render(request, 'inventory/dashboard.html', context)
 
 
 # =======================
@@ -100,20 +111,28 @@ def inventory_dashboard(request):
 # =======================
 @login_required
 def product_list(request):
-    # Get user locations
-    user_locations = get_user_locations(request.user)
-    
-    # Base queryset with optimizations
-    products = Product.objects.filter(
-        stocks__location__in=user_locations
-    ).select_related('category').prefetch_related(
+    # Ids of the user's locations, resolved once per request; literal ids
+    # keep the IN filters below free of nested location subqueries
+    user_location_ids = request.user_location_ids
+    
+    # Base queryset with optimizations; products stocked at any of the
+    # user's locations, via EXISTS rather than a join plus DISTINCT
+    # with_stock() sums the stock at those locations in SQL and classifies
+    # it, so the page needs no Python summation over the stock rows
+    products = Product.objects.filter(Exists(
+        ProductStock.objects.filter(product=OuterRef('pk'), location_id__in=user_location_ids)
+    )).with_stock(user_location_ids).select_related('category').prefetch_related(
+        # Only stocked locations get a badge, so empty rows are not fetched
         models.Prefetch(
             'stocks',
-            queryset=ProductStock.objects.filter(location__in=user_locations).select_related('location')
+            queryset=ProductStock.objects.filter(
+                location_id__in=user_location_ids, quantity__gt=0
+            ).select_related('location').only('product', 'quantity', 'location__name')
         )
-    ).distinct()
+    )
     
-    # Handle search
+    # Handle search; on PostgreSQL these icontains filters are served by
+    # the trigram indexes from migrations 0013 and 0020
     search_query = request.GET.get('q', '')
     if search_query:
         products = products.filter(
@@ -145,23 +164,24 @@ def product_list(request):
     out_of_stock_count = 0
     
     for product in page_obj:
-        stocks = product.stocks.all()  # Already prefetched
-        total_stock = sum(stock.quantity for stock in stocks)
-        
-        if total_stock == 0:
+        if product.stock_status == 'out_of_stock':
             out_of_stock_count += 1
-        elif total_stock <= product.reorder_level:
+        elif product.stock_status == 'low_stock':
             low_stock_count += 1
         
         product_data.append({
             'product': product,
-            'stocks': stocks,
-            'total_stock': total_stock
+            'stocks': product.stocks.all(),  # Already prefetched, for the per-location badges
+            'total_stock': product.total_stock
         })
     
     context = {
         'product_data': product_data,
-        'categories': Category.objects.all(),
+        'categories': cache.get_or_set(
+            CATEGORY_LIST_CACHE_KEY,
+            lambda: list(Category.objects.only('id', 'name').order_by('name')),
+            300,
+        ),
         'search_query': search_query,
         'category_filter': category_filter,
         'low_stock_count': low_stock_count,
@@ -179,43 +199,39 @@ def product_detail(request, product_id):
     )
     
     # Get stocks for this product in user's locations only
-    user_locations = get_user_locations(request.user)
+    user_location_ids = request.user_location_ids
     stocks = ProductStock.objects.filter(
         product=product, 
-        location__in=user_locations
+        location_id__in=user_location_ids
     ).select_related('location')
     
     # Get purchases for this product through PurchaseItem (filtered by user locations)
     purchase_items = PurchaseItem.objects.filter(
         product=product,
-        purchase__location__in=user_locations
+        purchase__location_id__in=user_location_ids
     ).select_related('purchase', 'purchase__location').order_by('-purchase__purchase_date')
     
     # Get sales for this product through SaleItem (filtered by user locations)
     sale_items = SaleItem.objects.filter(
         product=product,
-        sale__location__in=user_locations
+        sale__location_id__in=user_location_ids
     ).select_related('sale', 'sale__customer', 'sale__location').order_by('-sale__date')
     
     # Get transfers (filtered by user locations)
     transfers_out = StockTransfer.objects.filter(
         product=product, 
-        batch__from_location__in=user_locations
+        batch__from_location_id__in=user_location_ids
     ).select_related('batch__from_location', 'batch__to_location', 'transferred_by').order_by('-transfer_date')
     
     transfers_in = StockTransfer.objects.filter(
         product=product, 
-        batch__to_location__in=user_locations
+        batch__to_location_id__in=user_location_ids
     ).select_related('batch__from_location', 'batch__to_location', 'transferred_by').order_by('-transfer_date')
 
-    # Calculate total sold quantity
-    total_sold = sum(item.quantity for item in sale_items)
-    
-    # Calculate total purchased quantity
-    total_purchased = sum(item.quantity for item in purchase_items)
-    
-    # Calculate current stock
-    current_stock = sum(stock.quantity for stock in stocks)
+    # Totals are summed in the database; the querysets above stay lazy for display
+    total_sold = sale_items.aggregate(total=Sum('quantity', default=0))['total']
+    total_purchased = purchase_items.aggregate(total=Sum('quantity', default=0))['total']
+    current_stock = stocks.aggregate(total=Sum('quantity', default=0))['total']
 
     context = {
         'product': product,
@@ -258,15 +274,20 @@ def product_add(request):
                 messages.error(request, "Location is required")
                 return redirect('inventory:product_add')
             
-            # Check if user can access the selected location
+            # Check if user can access the selected location; the user's
+            # location ids are memoized and only hold existing locations, so
+            # the table is only read to word the error
             try:
-                location = Location.objects.get(id=location_id)
-                if not can_user_access_location(request.user, location):
-                    messages.error(request, "You don't have permission to access this location")
-                    return redirect('inventory:product_add')
-            except Location.DoesNotExist:
+                location_id = int(location_id)
+            except ValueError:
                 messages.error(request, "Invalid location selected")
                 return redirect('inventory:product_add')
+            if not can_user_access_location(request.user, location_id):
+                if Location.objects.filter(id=location_id).exists():
+                    messages.error(request, "You don't have permission to access this location")
+                else:
+                    messages.error(request, "Invalid location selected")
+                return redirect('inventory:product_add')
             
             # Convert numeric fields
             try:
@@ -300,7 +321,7 @@ def product_add(request):
             # Create product stock
             stock = ProductStock(
                 product=product,
-                location=location,
+                location_id=location_id,
                 quantity=qty
             )
             stock.save()
@@ -333,8 +354,7 @@ def product_delete(request, pk):
         product_name = product.name
         
         # Delete associated stock records first (only in user's locations)
-        user_locations = get_user_locations(request.user)
-        ProductStock.objects.filter(product=product, location__in=user_locations).delete()
+        ProductStock.objects.filter(product=product, location_id__in=request.user_location_ids).delete()
         
         # Then delete the product
         product.delete()
@@ -358,11 +378,11 @@ def product_edit(request, pk):
         user_locations = get_user_locations(request.user)
         categories = Category.objects.all()
         
-        # Get current stock quantities
-        current_stocks = {}
-        stocks = ProductStock.objects.filter(product=product, location__in=user_locations)
-        for stock in stocks:
-            current_stocks[stock.location.id] = stock.quantity
+        # Get current stock quantities as {location_id: quantity}
+        current_stocks = dict(
+            ProductStock.objects.filter(product=product, location_id__in=request.user_location_ids)
+            .values_list('location_id', 'quantity')
+        )
         
         if request.method == 'POST':
             try:
@@ -403,7 +423,8 @@ def product_edit(request, pk):
                 product.selling_price = selling_price
                 product.save()
                 
-                # Update stock quantities for each user location
+                # Work out the wanted quantity for each user location
+                changed_stocks = []
                 for location in user_locations:
                     quantity_key = f'quantity_{location.id}'
                     quantity_str = request.POST.get(quantity_key, '')
@@ -424,18 +445,24 @@ def product_edit(request, pk):
                         quantity = current_stocks.get(location.id, 0)
                         messages.warning(request, f"Invalid quantity for {location.name}, using current value: {quantity}")
                 
-                    # Update or create ProductStock record
-                    stock, created = ProductStock.objects.get_or_create(
-                        product=product,
-                        location=location,
-                        defaults={'quantity': quantity}
+                    # Only missing rows and changed quantities are written
+                    if current_stocks.get(location.id) != quantity:
+                        changed_stocks.append(ProductStock(
+                            product=product,
+                            location=location,
+                            quantity=quantity,
+                            reorder_level=product.reorder_level,
+                        ))
+
+                # Upsert them in one statement; reorder_level only applies to
+                # newly inserted rows (bulk_create skips save())
+                if changed_stocks:
+                    ProductStock.objects.bulk_create(
+                        changed_stocks,
+                        update_conflicts=True,
+                        unique_fields=['product', 'location'],
+                        update_fields=['quantity'],
                     )
-                    
-                    if not created:
-                        # Only update if quantity actually changed
-                        if stock.quantity != quantity:
-                            stock.quantity = quantity
-                            stock.save()
                 
                 messages.success(request, f"Product '{name}' updated successfully!")
                 return redirect('inventory:product_list')
@@ -475,9 +502,20 @@ def product_edit(request, pk):
 def purchase_list(request):
     """List all purchases with batch items"""
     # Get purchases filtered by user locations
-    purchases = Purchase.objects.all()
-    purchases = filter_queryset_by_user_locations(purchases, request.user)
-    purchases = purchases.select_related('location', 'created_by').prefetch_related('items__product').order_by('-purchase_date')
+    purchases = Purchase.objects.with_item_totals()
+    purchases = filter_queryset_by_user_locations(
+        purchases, request.user, location_ids=request.user_location_ids
+    )
+    # The item rows only feed the expandable detail table, so just the
+    # displayed columns are loaded
+    purchases = purchases.select_related('location', 'created_by').prefetch_related(
+        models.Prefetch(
+            'items',
+            queryset=PurchaseItem.objects.select_related('product').only(
+                'purchase_id', 'quantity', 'unit_price', 'product__name', 'product__sku'
+            ),
+        )
+    ).order_by('-purchase_date')
     
     # Apply filters
     search_query = request.GET.get('q', '')
@@ -486,6 +524,7 @@ def purchase_list(request):
     supplier_filter = request.GET.get('supplier', '')
     location_filter = request.GET.get('location', '')
     
+    # Trigram-indexed on PostgreSQL (migrations 0013 and 0020)
     if search_query:
         purchases = purchases.filter(
             Q(supplier_name__icontains=search_query) |
@@ -511,11 +550,29 @@ def purchase_list(request):
         except Location.DoesNotExist:
             pass
     
-    # Calculate statistics
-    total_spent = sum(float(purchase.total_amount) for purchase in purchases)
-    total_quantity = sum(purchase.get_total_quantity() for purchase in purchases)
-    supplier_names = set(purchase.supplier_name for purchase in purchases if purchase.supplier_name)
-    unique_suppliers = len(supplier_names)
+    # Pagination
+    paginator = Paginator(purchases, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    # Statistics cover every filtered purchase, not just the page. They are
+    # cached per filter set under the dashboard key, which is already scoped
+    # to the user's locations and invalidated when purchases change
+    filters = (search_query, date_from, date_to, supplier_filter, location_filter)
+    filters_hash = hashlib.md5(repr(filters).encode()).hexdigest()
+    stats_cache_key = f"{get_dashboard_stats_cache_key(request.user)}_purchases_{filters_hash}"
+
+    def compute_stats():
+        filtered_ids = purchases.values('pk')
+        stats = Purchase.objects.filter(pk__in=filtered_ids).aggregate(
+            total_spent=Sum('total_amount', default=0),
+            unique_suppliers=Count('supplier_name', distinct=True, filter=~Q(supplier_name='')),
+        )
+        stats['total_quantity'] = PurchaseItem.objects.filter(
+            purchase__in=filtered_ids
+        ).aggregate(total=Sum('quantity', default=0))['total']
+        return stats
+
+    stats = cache.get_or_set(stats_cache_key, compute_stats, DASHBOARD_STATS_TIMEOUT)
     
     # Get user locations for filter dropdown
     locations = get_user_locations(request.user)
@@ -524,16 +581,16 @@ def purchase_list(request):
     has_filters = any([search_query, date_from, date_to, supplier_filter, location_filter])
     
     context = {
-        'purchases': purchases,
+        'page_obj': page_obj,
         'locations': locations,
         'search_query': search_query,
         'date_from': date_from,
         'date_to': date_to,
         'supplier_filter': supplier_filter,
         'location_filter': location_filter,
-        'total_spent': total_spent,
-        'total_quantity': total_quantity,
-        'unique_suppliers': unique_suppliers,
+        'total_spent': stats['total_spent'],
+        'total_quantity': stats['total_quantity'],
+        'unique_suppliers': stats['unique_suppliers'],
         'has_filters': has_filters,
     }
     return render(request, 'inventory/purchase_list.html', context)
@@ -578,15 +635,24 @@ def purchase_add(request):
             messages.error(request, "Location is required")
             return redirect('inventory:purchase_add')
 
-        # Check if user can access the selected location
+        # Check if user can access the selected location; the user's
+        # location ids are memoized and only hold existing locations, so
+        # the table is only read to word the error
         try:
-            location = Location.objects.get(id=location_id)
-            if not can_user_access_location(request.user, location):
-                messages.error(request, "You don't have permission to access this location")
-                return redirect('inventory:purchase_add')
-        except Location.DoesNotExist:
+            location_id = int(location_id)
+        except ValueError:
             messages.error(request, "Invalid location selected")
             return redirect('inventory:purchase_add')
+        if not can_user_access_location(request.user, location_id):
+            if Location.objects.filter(id=location_id).exists():
+                messages.error(request, "You don't have permission to access this location")
+            else:
+                messages.error(request, "Invalid location selected")
+            return redirect('inventory:purchase_add')
+
+        # The user's locations were already fetched to build those ids, so
+        # the instance is picked from them rather than queried again
+        location = next(loc for loc in user_locations if loc.pk == location_id)
 
         if not items_data:
             messages.error(request, "Please add at least one product")
@@ -611,53 +677,69 @@ def purchase_add(request):
             purchase_datetime = timezone.now()
 
         try:
-            # Create Purchase (main purchase record)
-            purchase = Purchase.objects.create(
-                supplier_name=final_supplier_name,
-                location=location,
-                purchase_date=purchase_datetime,
-                notes=notes,
-                created_by=request.user
+            # Fetch every referenced product in one query; ids that do not
+            # parse are left out here and skipped with their line below
+            products_by_id = Product.objects.in_bulk(
+                [item.get('product_id') for item in items if str(item.get('product_id')).isdigit()]
             )
 
-            # Create PurchaseItem records (batch items)
-            total_amount = 0
-            successful_items = []
-            
-            for item in items:
-                product_id = item.get('product_id')
-                quantity = item.get('quantity', 0)
-                unit_price = item.get('unit_price', 0)
+            # The purchase, its items and their stock increments commit together
+            with transaction.atomic():
+                # Create Purchase (main purchase record)
+                purchase = Purchase.objects.create(
+                    supplier_name=final_supplier_name,
+                    location=location,
+                    purchase_date=purchase_datetime,
+                    notes=notes,
+                    created_by=request.user
+                )
+
+                # Create PurchaseItem records (batch items)
+                total_amount = 0
+                successful_items = []
+                stock_increments = {}
                 
-                try:
-                    product = Product.objects.get(id=product_id)
-                    quantity = int(quantity)
-                    unit_price = float(unit_price)
+                for item in items:
+                    quantity = item.get('quantity', 0)
+                    unit_price = item.get('unit_price', 0)
                     
-                    if quantity <= 0:
-                        continue
+                    try:
+                        product = products_by_id.get(int(item.get('product_id')))
+                        if product is None:
+                            continue
+                        quantity = int(quantity)
+                        unit_price = float(unit_price)
+                        
+                        if quantity <= 0:
+                            continue
+                            
+                        if unit_price <= 0:
+                            continue
                         
-                    if unit_price <= 0:
+                        # Collect the purchase item (batch item) for a single insert
+                        successful_items.append(PurchaseItem(
+                            purchase=purchase,
+                            product=product,
+                            quantity=quantity,
+                            unit_price=unit_price
+                        ))
+                        stock_increments[product.id] = stock_increments.get(product.id, 0) + quantity
+                        
+                        item_total = quantity * unit_price
+                        total_amount += item_total
+                        
+                    except (ValueError, TypeError) as e:
                         continue
-                    
-                    # Create the purchase item (batch item)
-                    purchase_item = PurchaseItem.objects.create(
-                        purchase=purchase,
-                        product=product,
-                        quantity=quantity,
-                        unit_price=unit_price
-                    )
-                    
-                    item_total = quantity * unit_price
-                    total_amount += item_total
-                    successful_items.append(purchase_item)
-                    
-                except (Product.DoesNotExist, ValueError, TypeError) as e:
-                    continue
 
-            # Update total amount
-            purchase.total_amount = total_amount
-            purchase.save()
+                PurchaseItem.objects.bulk_create(successful_items, batch_size=500)
+
+                # bulk_create skips PurchaseItem.save(), so apply its stock
+                # increments here, in one update plus one insert
+                ProductStock.objects.add_quantities(location, stock_increments)
+
+                # Update total amount
+                purchase.total_amount = total_amount
+                purchase.save(update_fields=['total_amount'])
 
             messages.success(
                 request, 
@@ -705,7 +787,7 @@ def purchase_delete(request, pk):
         purchase = get_object_or_404(Purchase, id=pk)
         
         # Check if user can access this purchase's location
-        if not can_user_access_location(request.user, purchase.location):
+        if not can_user_access_location(request.user, purchase.location_id):
             messages.error(request, "You don't have permission to delete this purchase")
             return redirect('inventory:purchase_list')
         
@@ -714,17 +796,13 @@ def purchase_delete(request, pk):
             reference = purchase.reference
             item_count = purchase.items.count()
             
-            # Reverse stock updates for all items before deleting
-            for item in purchase.items.all():
-                if purchase.location:
-                    try:
-                        # Use F() expression for atomic update
-                        ProductStock.objects.filter(
-                            product=item.product,
-                            location=purchase.location
-                        ).update(quantity=F('quantity') - item.quantity)
-                    except ProductStock.DoesNotExist:
-                        pass
+            # Reverse the stock added by every item in one UPDATE
+            if purchase.location_id:
+                quantities = dict(
+                    purchase.items.order_by().values('product_id')
+                    .annotate(total=Sum('quantity')).values_list('product_id', 'total')
+                )
+                ProductStock.objects.deduct_quantities(purchase.location_id, quantities)
             
             # Delete the purchase record
             purchase.delete()
@@ -765,8 +843,6 @@ def sale_list(request):
 @login_required
 @transaction.atomic
 def sale_add(request):
-    print('herererererererer')
-    
     # Get locations from core app
     from core.models import Location
     user_locations = get_user_locations(request.user)
@@ -775,7 +851,6 @@ def sale_add(request):
     from transactions.models import Customer
     
     if request.method == 'POST':
-        print('its a post requrest')
         form = SaleForm(request.POST, user=request.user)
         if form.is_valid():
             try:
@@ -792,35 +867,46 @@ def sale_add(request):
                 is_draft = 'save_draft' in request.POST
                 sale.document_status = 'draft' if is_draft else 'sent'
                 
-                # Save sale to get ID
-                sale.save()
-                
                 # Process sale items from the hidden field
                 items_data = request.POST.get('items_data', '[]')
                 items = json.loads(items_data)
+                products_by_id = Product.objects.in_bulk([item['product_id'] for item in items])
                 
-                total_amount = 0
-                for item in items:
-                    product = get_object_or_404(Product, id=item['product_id'])
-                    quantity = int(item['quantity'])
-                    unit_price = float(item['unit_price'])
-                    item_total = float(item['total'])
-                    
-                    # Create sale item
-                    sale_item = SaleItem.objects.create(
-                        sale=sale,
-                        product=product,
-                        quantity=quantity,
-                        unit_price=unit_price,
-                        total_price=item_total
-                    )
-                    
-                    total_amount += item_total
+                # Run the writes in a savepoint so a failed stock check rolls
+                # back the sale and earlier items instead of being committed
+                # by the view-level transaction after the error is caught
+                with transaction.atomic():
+                    # Save sale to get ID
+                    sale.save()
                     
-                    # REDUCE STOCK ONLY if not a draft and not a quotation
-                    if not is_draft and sale.document_type != 'quotation' and sale.location:
-                        try:
-                            # Use F() expression to prevent race conditions
+                    total_amount = 0
+                    sale_items = []
+                    for item in items:
+                        product = products_by_id.get(int(item['product_id']))
+                        if product is None:
+                            raise ValueError(f"Product {item['product_id']} not found")
+                        quantity = int(item['quantity'])
+                        unit_price = float(item['unit_price'])
+                        item_total = float(item['total'])
+                        
+                        # Collect sale items for a single insert; bulk_create skips
+                        # SaleItem.save(), so set its line total here and the sale
+                        # total once below
+                        sale_items.append(SaleItem(
+                            sale=sale,
+                            product=product,
+                            quantity=quantity,
+                            unit_price=unit_price,
+                            total_price=quantity * unit_price
+                        ))
+                        
+                        total_amount += item_total
+                        
+                        # REDUCE STOCK ONLY if not a draft and not a quotation
+                        if not is_draft and sale.document_type != 'quotation' and sale.location:
+                            # The quantity__gte guard and F() decrement run as a
+                            # single conditional UPDATE, so concurrent sales
+                            # cannot both pass the check and oversell
                             updated = ProductStock.objects.filter(
                                 product=product, 
                                 location=sale.location,
@@ -829,13 +915,12 @@ def sale_add(request):
                             
                             if not updated:
                                 raise ValueError(f"Not enough stock for {product.name}")
-                            
-                        except ProductStock.DoesNotExist:
-                            raise ValueError(f"No stock found for {product.name} at {sale.location.name}")
-                
-                # Update sale total amount
-                sale.total_amount = total_amount
-                sale.save()
+                    
+                    SaleItem.objects.bulk_create(sale_items)
+                    
+                    # Update sale total amount
+                    sale.total_amount = total_amount
+                    sale.save(update_fields=['total_amount', 'updated_at'])
                 
                 # Success message
                 status_text = "drafted" if is_draft else "created"
@@ -853,7 +938,6 @@ def sale_add(request):
             messages.error(request, "Please correct the errors below.")
     
     else:
-        print('its get request')
         form = SaleForm(user=request.user)
         # Set initial location to user's default
         default_location = get_user_default_location(request.user)
@@ -863,35 +947,39 @@ def sale_add(request):
     # Filter locations in form to only show accessible ones
     form.fields['location'].queryset = user_locations
     
-    print('reaches')
-    print(f'Locations count: {user_locations.count()}')
-    print(f'Customers count: {Customer.objects.count()}')
-    print(f'Products count: {Product.objects.count()}')
-    
     return render(request, 'inventory/sale_add.html', {
         'form': form,
         'document_types': DocumentType.choices,
         'currencies': Currency.choices,
         'locations': user_locations,  # ADD THIS - locations from core app
-        'customers': Customer.objects.all(),  # ADD THIS - customers from transactions app
         'products': Product.objects.all().select_related('category'),  # ADD THIS - products from inventory
         'default_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),  # ADD THIS
     })
 
+def product_catalog_etag(request, *args, **kwargs):
+    """ETag for product catalog responses: product count plus latest change"""
+    stamp = Product.objects.aggregate(count=Count('id'), last_updated=Max('updated_at'))
+    last_updated = stamp['last_updated'].timestamp() if stamp['last_updated'] else 0
+    return f"products-{stamp['count']}-{last_updated}"
+
+
 @login_required
+@condition(etag_func=product_catalog_etag)
 def api_products(request):
     """API endpoint for product search"""
-    products = Product.objects.select_related('category').all()
+    products = Product.objects.values(
+        'id', 'name', 'sku', 'cost_price', 'selling_price', 'category__name'
+    )
     product_list = []
     
     for product in products:
         product_list.append({
-            'id': product.id,
-            'name': product.name,
-            'sku': product.sku,
-            'cost_price': float(product.cost_price),
-            'selling_price': float(product.selling_price),
-            'category_name': product.category.name if product.category else 'Uncategorized'
+            'id': product['id'],
+            'name': product['name'],
+            'sku': product['sku'],
+            'cost_price': float(product['cost_price']),
+            'selling_price': float(product['selling_price']),
+            'category_name': product['category__name'] or 'Uncategorized'
         })
     
     return JsonResponse({'products': product_list})
@@ -906,14 +994,16 @@ def api_product_stock(request, product_id, location_id):
         if not can_user_access_location(request.user, location):
             return JsonResponse({'error': 'Access denied'}, status=403)
             
-        stock = ProductStock.objects.get(
+        stock = ProductStock.objects.select_related('product').only(
+            'quantity', 'product__name'
+        ).get(
             product_id=product_id,
             location_id=location_id
         )
         return JsonResponse({
             'quantity': stock.quantity,
             'product': stock.product.name,
-            'location': stock.location.name
+            'location': location.name
         })
     except ProductStock.DoesNotExist:
         return JsonResponse({'quantity': 0, 'product': '', 'location': ''})
@@ -927,29 +1017,45 @@ def product_search_api(request):
     query = request.GET.get('q', '').strip()
     
     try:
-        # Query products with category
-        if query:
-            products = Product.objects.filter(
-                Q(name__icontains=query) | Q(sku__icontains=query)
-            ).select_related('category')[:15]
-        else:
-            products = Product.objects.all().select_related('category')[:10]
+        # Typeahead fires a request per keystroke, so matches are cached
+        # briefly per (case-insensitive) query; stock is always read fresh
+        cache_key = f"product_search_{hashlib.md5(query.lower().encode()).hexdigest()}"
+        product_list = cache.get(cache_key)
+        
+        if product_list is None:
+            # Query products with category; on PostgreSQL these icontains
+            # filters are served by the trigram indexes from migration 0013
+            # rows come back as plain dicts, skipping model instantiation
+            if query:
+                products = Product.objects.filter(
+                    Q(name__icontains=query) | Q(sku__icontains=query)
+                )[:15]
+            else:
+                products = Product.objects.all()[:10]
+            products = products.values('id', 'name', 'sku', 'selling_price', 'category__name')
 
-        product_list = []
-        for product in products:
-            # Get stock quantity safely
-            stock_quantity = ProductStock.objects.filter(
-                product_id=product.id
-            ).aggregate(total=Sum('quantity'))['total'] or 0
+            product_list = []
+            for product in products:
+                product_list.append({
+                    'id': product['id'],
+                    'name': product['name'],
+                    'sku': product['sku'] or 'N/A',
+                    'selling_price': str(product['selling_price']),
+                    'category': product['category__name'] or 'General',
+                })
+            cache.set(cache_key, product_list, 30)
 
-            product_list.append({
-                'id': product.id,
-                'name': product.name,
-                'sku': product.sku or 'N/A',
-                'selling_price': str(product.selling_price),
-                'category': product.category.name if product.category else 'General',
-                'stock': stock_quantity
-            })
+        # Get stock totals for all matched products in one grouped query
+        stock_totals = dict(
+            ProductStock.objects.filter(
+                product_id__in=[product['id'] for product in product_list]
+            ).values_list('product_id').annotate(total=Sum('quantity')).order_by()
+        )
+
+        product_list = [
+            {**product, 'stock': stock_totals.get(product['id'], 0)}
+            for product in product_list
+        ]
 
         return JsonResponse({'products': product_list})
     
@@ -971,15 +1077,7 @@ def print_sale(request, pk):
         return redirect('inventory:sale_list')
     
     # Get company details
-    company = CompanyDetails.objects.first()
-    if not company:
-        # Create default company details if they don't exist
-        company = CompanyDetails.objects.create(
-            name="Teba Inventory",
-            address="Your company address here",
-            phone="+255 XXX XXX XXX",
-            email="info@teba.com"
-        )
+    company = CompanyDetails.get_solo()
     
     # Auto-print if requested
     auto_print = request.GET.get('autoprint') == 'true'
@@ -1121,7 +1219,7 @@ def sales_report(request):
 @login_required
 def transfer_list(request):
     # Get all transfer batches with their items
-    transfer_batches = TransferBatch.objects.all()
+    transfer_batches = TransferBatch.objects.with_item_totals()
     transfer_batches = filter_queryset_by_user_locations(transfer_batches, request.user, 'from_location')
     transfer_batches = transfer_batches.prefetch_related('items__product').select_related('from_location', 'to_location', 'created_by').order_by('-created_at')
     
@@ -1268,7 +1366,7 @@ def transfer_add(request):
                 
                 # Check stock availability
                 try:
-                    from_stock = ProductStock.objects.get(
+                    from_stock = ProductStock.objects.only('id', 'quantity').get(
                         product=product, 
                         location=from_location
                     )
@@ -1445,8 +1543,19 @@ def transfer_detail(request, batch_id):
 # =======================
 @login_required
 def stock_report(request):
-    # Get all products with related data
-    products = Product.objects.all().select_related('category').prefetch_related('stocks')
+    user_locations = get_user_locations(request.user)
+    
+    # Get all products with their stock total across the user's locations
+    # and its cost value computed in the database, one row per product
+    # (user_stock, not total_stock, which is Product's all-locations property)
+    products = Product.objects.all().select_related('category').annotate(
+        user_stock=Sum('stocks__quantity', filter=Q(stocks__location__in=user_locations), default=0),
+    ).annotate(
+        stock_value=ExpressionWrapper(
+            F('user_stock') * F('cost_price'),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        ),
+    )
     
     # Get filter parameters
     search_query = request.GET.get('q', '')
@@ -1464,6 +1573,11 @@ def stock_report(request):
     if category_filter:
         products = products.filter(category_id=category_filter)
     
+    if location_filter:
+        products = products.annotate(
+            location_stock=Sum('stocks__quantity', filter=Q(stocks__location_id=location_filter), default=0),
+        )
+    
     # Prepare product data with stock information
     product_data = []
     total_value = 0
@@ -1471,13 +1585,9 @@ def stock_report(request):
     low_stock_count = 0
     out_of_stock_count = 0
     
-    user_locations = get_user_locations(request.user)
-    
     for product in products:
-        # Calculate total stock across user's locations only
-        stocks = product.stocks.filter(location__in=user_locations)
-        total_stock = sum(stock.quantity for stock in stocks)
-        stock_value = total_stock * float(product.cost_price)
+        total_stock = product.user_stock
+        stock_value = float(product.stock_value)
         total_value += stock_value
         
         # Apply status filter
@@ -1491,10 +1601,9 @@ def stock_report(request):
         
         # Apply location filter
         if location_filter:
-            location_stock = product.stocks.filter(location_id=location_filter).first()
-            if not location_stock or location_stock.quantity == 0:
+            if not product.location_stock:
                 continue
-            total_stock = location_stock.quantity
+            total_stock = product.location_stock
             stock_value = total_stock * float(product.cost_price)
         
         # Count stock status
@@ -1509,7 +1618,6 @@ def stock_report(request):
             'product': product,
             'total_stock': total_stock,
             'stock_value': stock_value,
-            'stocks': stocks
         })
     
     # Prepare summary
@@ -1539,16 +1647,15 @@ def stock_report(request):
 # CSV EXPORT/IMPORT
 # =======================
 
+class EchoBuffer:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+
 @login_required
 def export_products_csv(request):
     """Export comprehensive products data to CSV"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="products_complete_export_{}.csv"'.format(
-        timezone.now().strftime("%Y%m%d_%H%M%S")
-    )
-
-    writer = csv.writer(response)
-    
     # Comprehensive header
     header = [
         'ID', 'Name', 'SKU', 'Category', 'Cost Price', 'Selling Price', 
@@ -1556,54 +1663,72 @@ def export_products_csv(request):
     ]
     
     # Add individual location stocks
-    user_locations = get_user_locations(request.user)
+    user_locations = list(get_user_locations(request.user))
     for location in user_locations:
         header.append(f'Stock_{location.name}')
-    
-    writer.writerow(header)
 
-    # Get all products (not filtered by stock to include zero-stock items)
-    products = Product.objects.all().select_related('category').prefetch_related(
-        models.Prefetch(
-            'stocks',
-            queryset=ProductStock.objects.filter(location__in=user_locations)
-        )
+    # Stock per product and location as plain tuples: a small dict of ints
+    # replaces the prefetch, which built a model instance per stock row
+    stock_by_product = {}
+    stock_rows = ProductStock.objects.filter(location__in=user_locations).values_list(
+        'product_id', 'location_id', 'quantity'
+    )
+    for product_id, location_id, quantity in stock_rows.iterator(chunk_size=2000):
+        stock_by_product.setdefault(product_id, {})[location_id] = quantity
+    location_ids = [location.id for location in user_locations]
+
+    # Get all products (not filtered by stock to include zero-stock items),
+    # as tuples straight from the cursor rather than model instances
+    products = Product.objects.order_by('id').values_list(
+        'id', 'name', 'sku', 'category__name', 'cost_price', 'selling_price', 'reorder_level'
     )
 
-    for product in products:
-        # Calculate total stock across user locations
-        total_stock = sum(stock.quantity for stock in product.stocks.all())
-        stock_value = total_stock * float(product.cost_price)
-        
-        # Determine stock status
-        if total_stock == 0:
-            status = 'Out of Stock'
-        elif total_stock <= product.reorder_level:
-            status = 'Low Stock'
-        else:
-            status = 'In Stock'
-
-        # Base row data
-        row = [
-            product.id,
-            product.name,
-            product.sku or '',
-            product.category.name if product.category else 'Uncategorized',
-            f"{product.cost_price:.2f}",
-            f"{product.selling_price:.2f}",
-            product.reorder_level,
-            total_stock,
-            f"{stock_value:.2f}",
-            status
-        ]
+    def export_rows():
+        yield header
         
-        # Add stock quantities for each location
-        for location in user_locations:
-            location_stock = product.stocks.filter(location=location).first()
-            row.append(str(location_stock.quantity) if location_stock else '0')
-        
-        writer.writerow(row)
+        # Read products in chunks so large catalogs are never held in memory
+        for product_id, name, sku, category_name, cost_price, selling_price, reorder_level in products.iterator(chunk_size=2000):
+            stock_by_location = stock_by_product.get(product_id, {})
+            
+            # Calculate total stock across user locations
+            total_stock = sum(stock_by_location.values())
+            stock_value = total_stock * float(cost_price)
+            
+            # Determine stock status
+            if total_stock == 0:
+                status = 'Out of Stock'
+            elif total_stock <= reorder_level:
+                status = 'Low Stock'
+            else:
+                status = 'In Stock'
+
+            # Base row data
+            row = [
+                product_id,
+                name,
+                sku or '',
+                category_name or 'Uncategorized',
+                f"{cost_price:.2f}",
+                f"{selling_price:.2f}",
+                reorder_level,
+                total_stock,
+                f"{stock_value:.2f}",
+                status
+            ]
+            
+            # Add stock quantities for each location
+            row.extend(str(stock_by_location.get(location_id, 0)) for location_id in location_ids)
+            
+            yield row
 
+    writer = csv.writer(EchoBuffer())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in export_rows()),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = 'attachment; filename="products_complete_export_{}.csv"'.format(
+        timezone.now().strftime("%Y%m%d_%H%M%S")
+    )
     return response
 
 # =======================
@@ -1743,7 +1868,7 @@ def delete_retail_sale(request, sale_id):
             
             # Manually reverse the stock operations before deleting
             # Return quantity to main stock
-            main_stock = ProductStock.objects.get(
+            main_stock = ProductStock.objects.only('id', 'quantity').get(
                 product=sale.product,
                 location=sale.location
             )
@@ -1751,7 +1876,7 @@ def delete_retail_sale(request, sale_id):
             main_stock.save()
             
             # Remove from retail stock
-            retail_stock = RetailStock.objects.get(
+            retail_stock = RetailStock.objects.only('id', 'quantity').get(
                 product=sale.product,
                 location=sale.location
             )
@@ -1785,14 +1910,16 @@ def get_product_stock(request, product_id, location_id):
         if not can_user_access_location(request.user, location):
             return JsonResponse({'error': 'Access denied'}, status=403)
             
-        stock = ProductStock.objects.get(
+        stock = ProductStock.objects.select_related('product').only(
+            'quantity', 'product__name'
+        ).get(
             product_id=product_id,
             location_id=location_id
         )
         return JsonResponse({
             'quantity': float(stock.quantity),
             'product': stock.product.name,
-            'location': stock.location.name
+            'location': location.name
         })
     except ProductStock.DoesNotExist:
         return JsonResponse({'quantity': 0, 'product': '', 'location': ''}, status=404)
@@ -1800,6 +1927,25 @@ def get_product_stock(request, product_id, location_id):
         return JsonResponse({'error': 'Location not found'}, status=404)
 
 
+@login_required
+def get_product_stock_bulk(request):
+    """API endpoint to get current stock for several products at a location"""
+    try:
+        location = Location.objects.get(id=request.GET.get('location_id'))
+    except (Location.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Location not found'}, status=404)
+    if not can_user_access_location(request.user, location):
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    product_ids = [pid for pid in request.GET.getlist('product_ids') if pid.isdigit()]
+    # One query for the whole cart; products without a stock row are omitted
+    stock = ProductStock.objects.filter(
+        product_id__in=product_ids,
+        location=location
+    ).values_list('product_id', 'quantity')
+    return JsonResponse({'stock': {product_id: float(quantity) for product_id, quantity in stock}})
+
+
 # =======================
 # PAYMENTS
 # =======================
@@ -1897,7 +2043,7 @@ def delete_payment(request, payment_id):
 @login_required
 def purchase_order_list(request):
     """List all purchase orders with filters"""
-    purchase_orders = PurchaseOrder.objects.all()
+    purchase_orders = PurchaseOrder.objects.with_item_totals()
     purchase_orders = filter_queryset_by_user_locations(purchase_orders, request.user)
     purchase_orders = purchase_orders.select_related('location', 'created_by').prefetch_related('items__product').order_by('-created_at')
     
@@ -1955,7 +2101,7 @@ def purchase_order_list(request):
 def purchase_order_add(request):
     """Add new purchase order with multiple items"""
     user_locations = get_user_locations(request.user)
-    products = Product.objects.all().select_related('category')
+    products = Product.objects.with_total_stock().select_related('category')
     
     if request.method == "POST":
         supplier_name = request.POST.get('supplier_name')
@@ -2133,7 +2279,7 @@ def mark_purchase_received(request, order_id):
 @login_required
 def sale_order_list(request):
     """List all sale orders with filters"""
-    sale_orders = SaleOrder.objects.all()
+    sale_orders = SaleOrder.objects.with_item_totals()
     sale_orders = filter_queryset_by_user_locations(sale_orders, request.user)
     sale_orders = sale_orders.select_related('customer', 'location', 'created_by').prefetch_related('items__product').order_by('-created_at')
     
@@ -2362,28 +2508,27 @@ def confirm_sale_order(request, order_id):
             messages.error(request, f'Error confirming sale order: {str(e)}')
             return redirect('inventory:sale_order_list')
     
-    # GET request - show confirmation page
-    order_items = sale_order.items.select_related('product').all()
+    # GET request - show confirmation page; each item carries its stock at
+    # the order's location and what would remain, so neither the check
+    # below nor the template does per-row queries or arithmetic
+    location_stock = ProductStock.objects.filter(
+        product=OuterRef('product'),
+        location=sale_order.location,
+    ).values('quantity')[:1]
+    order_items = sale_order.items.select_related('product').annotate(
+        location_stock=Coalesce(Subquery(location_stock), 0),
+    ).annotate(
+        stock_after=ExpressionWrapper(F('location_stock') - F('quantity'), output_field=IntegerField()),
+    )
     
     # Check stock availability
     stock_issues = []
-    for item in order_items:
-        if sale_order.location:
-            try:
-                stock = ProductStock.objects.get(
-                    product=item.product,
-                    location=sale_order.location
-                )
-                if stock.quantity < item.quantity:
-                    stock_issues.append({
-                        'product': item.product.name,
-                        'available': stock.quantity,
-                        'requested': item.quantity
-                    })
-            except ProductStock.DoesNotExist:
+    if sale_order.location:
+        for item in order_items:
+            if item.location_stock < item.quantity:
                 stock_issues.append({
                     'product': item.product.name,
-                    'available': 0,
+                    'available': item.location_stock,
                     'requested': item.quantity
                 })
     
@@ -3234,14 +3379,7 @@ def print_purchase(request, pk):
         messages.error(request, "You don't have permission to access this purchase")
         return redirect('inventory:purchase_list')
     
-    company = CompanyDetails.objects.first()
-    if not company:
-        company = CompanyDetails.objects.create(
-            name="Teba Inventory",
-            address="Your company address here",
-            phone="+255 XXX XXX XXX",
-            email="info@teba.com"
-        )
+    company = CompanyDetails.get_solo()
     
     context = {
         'purchase': purchase,
@@ -3273,15 +3411,7 @@ def sale_order_detail(request, pk):
 def company_details(request):
     """View and edit company details"""
     # Get or create company details (there should only be one)
-    company, created = CompanyDetails.objects.get_or_create(
-        id=1,  # Ensure we only have one record
-        defaults={
-            'name': 'Teba Inventory',
-            'address': 'Your company address here',
-            'phone': '+255 XXX XXX XXX', 
-            'email': 'info@teba.com'
-        }
-    )
+    company = CompanyDetails.get_solo()
     
     if request.method == 'POST':
         # Handle form submission
@@ -3334,7 +3464,18 @@ def import_products_csv(request):
         user_locations = {loc.name: loc for loc in get_user_locations(request.user)}
         print(f"📍 User locations: {list(user_locations.keys())}")
         
-        for row_num, row in enumerate(reader, start=2):
+        # Rows are validated first and written afterwards with batched
+        # upserts instead of an update_or_create per product and stock row.
+        # The last row for a SKU (or SKU and location) wins, as before.
+        rows = list(reader)
+        existing_skus = set(Product.objects.filter(
+            sku__in=[row['SKU'] for row in rows if row.get('SKU')]
+        ).values_list('sku', flat=True))
+        products_by_sku = {}
+        stock_by_key = {}
+        categories = {}
+        
+        for row_num, row in enumerate(rows, start=2):
             print(f"🔍 Processing row {row_num}: {row.get('Name', 'No Name')}")
             
             try:
@@ -3347,12 +3488,15 @@ def import_products_csv(request):
                 category_name = row.get('Category', '').strip()
                 category = None
                 if category_name:
-                    category, created = Category.objects.get_or_create(
-                        name=category_name,
-                        defaults={'description': f'Imported category: {category_name}'}
-                    )
-                    if created:
-                        print(f"📁 Created new category: {category_name}")
+                    category = categories.get(category_name)
+                    if category is None:
+                        category, created = Category.objects.get_or_create(
+                            name=category_name,
+                            defaults={'description': f'Imported category: {category_name}'}
+                        )
+                        categories[category_name] = category
+                        if created:
+                            print(f"📁 Created new category: {category_name}")
                 
                 # Handle prices with validation - FIXED VERSION
                 try:
@@ -3397,19 +3541,19 @@ def import_products_csv(request):
                 
                 print(f"💰 Price validation passed: ${cost_price:,.2f} -> ${selling_price:,.2f}")
                 
-                # Create or update product
-                product, created = Product.objects.update_or_create(
+                # Queue the product for the create-or-update upsert below
+                created = row['SKU'] not in existing_skus
+                existing_skus.add(row['SKU'])
+                products_by_sku[row['SKU']] = Product(
                     sku=row['SKU'],
-                    defaults={
-                        'name': row['Name'],
-                        'category': category,
-                        'cost_price': cost_price,
-                        'selling_price': selling_price,
-                        'reorder_level': reorder_level
-                    }
+                    name=row['Name'],
+                    category=category,
+                    cost_price=cost_price,
+                    selling_price=selling_price,
+                    reorder_level=reorder_level
                 )
                 
-                print(f"📦 {'Created' if created else 'Updated'} product: {product.name} (SKU: {product.sku})")
+                print(f"📦 {'Creating' if created else 'Updating'} product: {row['Name']} (SKU: {row['SKU']})")
                 
                 # Process location quantities - ALLOW ZERO QUANTITIES
                 location_updates = 0
@@ -3440,18 +3584,14 @@ def import_products_csv(request):
                         if location_name in user_locations:
                             location = user_locations[location_name]
                             
-                            # Update or create stock record - EVEN IF QUANTITY IS 0
-                            stock, stock_created = ProductStock.objects.update_or_create(
-                                product=product,
-                                location=location,
-                                defaults={'quantity': quantity}
-                            )
+                            # Queue the stock record - EVEN IF QUANTITY IS 0
+                            stock_by_key[(row['SKU'], location.id)] = quantity
                             
                             location_updates += 1
                             stock_updates_count += 1
                             location_details.append(f"{location_name}: {quantity}")
                             
-                            print(f"🏪 {'Created' if stock_created else 'Updated'} stock: {location_name} = {quantity}")
+                            print(f"🏪 Stock: {location_name} = {quantity}")
                             
                         else:
                             errors.append(f"Row {row_num}: Location '{location_name}' not found or no access")
@@ -3488,6 +3628,52 @@ def import_products_csv(request):
                 errors.append(error_msg)
                 continue
         
+        # Write everything in batched upserts, all or nothing
+        if products_by_sku:
+            try:
+                with transaction.atomic():
+                    Product.objects.bulk_create(
+                        products_by_sku.values(),
+                        batch_size=500,
+                        update_conflicts=True,
+                        unique_fields=['sku'],
+                        update_fields=['name', 'category', 'cost_price', 'selling_price', 'reorder_level', 'updated_at'],
+                    )
+                    product_ids = dict(
+                        Product.objects.filter(sku__in=products_by_sku).values_list('sku', 'id')
+                    )
+                    
+                    # bulk_create skips save() and post_save, so do what
+                    # inventory.signals would: copy reorder levels onto the
+                    # existing stock rows and expire the dashboard totals
+                    ProductStock.objects.filter(product_id__in=product_ids.values()).update(
+                        reorder_level=Subquery(
+                            Product.objects.filter(pk=OuterRef('product_id')).values('reorder_level')[:1]
+                        )
+                    )
+                    ProductStock.objects.bulk_create(
+                        [
+                            ProductStock(
+                                product_id=product_ids[sku],
+                                location_id=location_id,
+                                quantity=quantity,
+                                reorder_level=products_by_sku[sku].reorder_level,
+                            )
+                            for (sku, location_id), quantity in stock_by_key.items()
+                        ],
+                        batch_size=500,
+                        update_conflicts=True,
+                        unique_fields=['product', 'location'],
+                        update_fields=['quantity'],
+                    )
+                clear_dashboard_stats_cache()
+            except Exception as e:
+                error_msg = f"Import failed, no products were saved - {str(e)}"
+                print(f"❌ {error_msg}")
+                errors.append(error_msg)
+                imported_count = updated_count = stock_updates_count = 0
+                success_items = []
+        
         print(f"🎯 FINAL RESULTS: {imported_count} imported, {updated_count} updated, {stock_updates_count} stock updates, {len(errors)} errors")
         
         # Store results in session for display
@@ -3599,7 +3785,7 @@ def stocktake_create(request):
             
             # Create stocktake items
             for product in products_with_stock:
-                stock = ProductStock.objects.get(product=product, location=location)
+                stock = ProductStock.objects.only('id', 'quantity').get(product=product, location=location)
                 StockTakeItem.objects.create(
                     stock_take=stocktake,
                     product=product,
@@ -6617,20 +6803,21 @@ def reports_dashboard(request):
     try:
         user_locations = get_user_locations(request.user)
         
-        # Product statistics with safe counting
-        total_products = Product.objects.filter(
-            stocks__location__in=user_locations
-        ).distinct().count()
+        # Product statistics with safe counting; EXISTS semi-joins avoid
+        # counting DISTINCT over the product/stock join
+        location_stocks = ProductStock.objects.filter(
+            product=OuterRef('pk'),
+            location__in=user_locations
+        )
+        total_products = approx_count(Product.objects.filter(Exists(location_stocks)))
         
-        low_stock_products = Product.objects.filter(
-            stocks__location__in=user_locations,
-            stocks__quantity__lt=F('reorder_level')
-        ).distinct().count()
+        low_stock_products = Product.objects.filter(Exists(
+            location_stocks.filter(is_low=True)
+        )).count()
         
-        out_of_stock_products = Product.objects.filter(
-            stocks__location__in=user_locations,
-            stocks__quantity=0
-        ).distinct().count()
+        out_of_stock_products = Product.objects.filter(Exists(
+            location_stocks.filter(quantity=0)
+        )).count()
         
         # Sales statistics (last 30 days) with safe aggregation
         thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
@@ -6730,18 +6917,19 @@ def sales_summary_report(request):
         
         # Calculate summary statistics safely
         total_revenue = sales.aggregate(total=Sum('total_amount'))['total'] or 0
-        total_cost = 0
-        total_profit = 0
         
-        # Safely calculate cost and profit
-        for sale in sales.prefetch_related('items__product'):
-            for item in sale.items.all():
-                try:
-                    cost = float(item.product.cost_price or 0) * item.quantity
-                    total_cost += cost
-                    total_profit += float(item.total_price or 0) - cost
-                except (TypeError, ValueError):
-                    continue
+        # Cost and profit summed by the database over the sales' items,
+        # rather than loading every sale and item into Python
+        item_totals = SaleItem.objects.filter(sale__in=sales).aggregate(
+            cost=Sum(
+                F('product__cost_price') * F('quantity'),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+                default=0,
+            ),
+            revenue=Sum('total_price', default=0),
+        )
+        total_cost = float(item_totals['cost'])
+        total_profit = float(item_totals['revenue']) - total_cost
         
         total_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
         
@@ -6881,8 +7069,27 @@ def product_performance_report(request):
             except ValueError:
                 pass
         
-        # Get product performance data safely
-        products = Product.objects.all()
+        # Get product performance data in one query: units sold, revenue and
+        # current stock are grouped per product by correlated subqueries
+        product_items = SaleItem.objects.filter(
+            sale__in=sales,
+            product=OuterRef('pk')
+        ).order_by().values('product')
+        product_stock = ProductStock.objects.filter(
+            product=OuterRef('pk'),
+            location__in=user_locations
+        ).order_by().values('product')
+        products = Product.objects.annotate(
+            sold=Coalesce(Subquery(product_items.annotate(total=Sum('quantity')).values('total')), 0),
+            revenue=Coalesce(
+                Subquery(product_items.annotate(total=Sum('total_price')).values('total')),
+                Value(0),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            stock=Coalesce(Subquery(product_stock.annotate(total=Sum('quantity')).values('total')), 0),
+        )
+        # Only include products that meet minimum sales threshold
+        products = products.filter(sold__gte=min_sales)
         if category_id:
             products = products.filter(category_id=category_id)
         
@@ -6890,36 +7097,23 @@ def product_performance_report(request):
         
         for product in products:
             try:
-                # Get sales data for this product
-                sale_items = SaleItem.objects.filter(
-                    sale__in=sales,
-                    product=product
-                )
-                
-                total_sold = sale_items.aggregate(total=Sum('quantity'))['total'] or 0
-                total_revenue = sale_items.aggregate(total=Sum('total_price'))['total'] or 0
+                total_sold = product.sold
+                total_revenue = float(product.revenue)
                 total_cost = float(product.cost_price or 0) * total_sold
                 total_profit = total_revenue - total_cost
                 profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+                current_stock = product.stock
                 
-                # Get current stock safely
-                current_stock = ProductStock.objects.filter(
-                    product=product,
-                    location__in=user_locations
-                ).aggregate(total=Sum('quantity'))['total'] or 0
-                
-                # Only include products that meet minimum sales threshold
-                if total_sold >= min_sales:
-                    product_performance.append({
-                        'product': product,
-                        'total_sold': total_sold,
-                        'total_revenue': total_revenue,
-                        'total_cost': total_cost,
-                        'total_profit': total_profit,
-                        'profit_margin': profit_margin,
-                        'current_stock': current_stock,
-                        'stock_turnover': total_sold / current_stock if current_stock > 0 else 0,
-                    })
+                product_performance.append({
+                    'product': product,
+                    'total_sold': total_sold,
+                    'total_revenue': total_revenue,
+                    'total_cost': total_cost,
+                    'total_profit': total_profit,
+                    'profit_margin': profit_margin,
+                    'current_stock': current_stock,
+                    'stock_turnover': total_sold / current_stock if current_stock > 0 else 0,
+                })
             except Exception as e:
                 logger.error(f"Error processing product {product.id}: {str(e)}")
                 continue
@@ -6996,73 +7190,59 @@ def inventory_valuation_report(request):
         stock_status = request.GET.get('stock_status', 'all')
         location_id = request.GET.get('location', '')
         
-        # Get products with safe filtering
-        products = Product.objects.all()
+        if location_id:
+            stock_filter = Q(stocks__location_id=location_id)
+        else:
+            stock_filter = Q(stocks__location__in=user_locations)
+        
+        # Get products with their stock total, valuation and stock status
+        # computed in a single grouped query
+        products = Product.objects.select_related('category').annotate(
+            total_quantity=Sum('stocks__quantity', filter=stock_filter, default=0),
+        ).annotate(
+            valuation=ExpressionWrapper(
+                F('total_quantity') * F('cost_price'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            ),
+            status=Case(
+                When(total_quantity=0, then=Value('out_of_stock')),
+                When(total_quantity__lte=F('reorder_level'), then=Value('low_stock')),
+                When(total_quantity__gt=F('reorder_level') * 3, then=Value('excess_stock')),
+                default=Value('normal'),
+                output_field=models.CharField(),
+            ),
+        )
         if category_id:
             products = products.filter(category_id=category_id)
         
         inventory_data = []
         total_valuation = 0
         total_items = 0
-        low_stock_count = 0
-        out_of_stock_count = 0
-        excess_stock_count = 0
+        status_counts = {'low_stock': 0, 'out_of_stock': 0, 'excess_stock': 0, 'normal': 0}
+        status_filters = {'low': 'low_stock', 'out': 'out_of_stock', 'excess': 'excess_stock', 'normal': 'normal'}
         
         for product in products:
-            try:
-                # Get stock safely
-                if location_id:
-                    stocks = ProductStock.objects.filter(
-                        product=product,
-                        location_id=location_id
-                    )
-                else:
-                    stocks = ProductStock.objects.filter(
-                        product=product,
-                        location__in=user_locations
-                    )
-                
-                total_quantity = stocks.aggregate(total=Sum('quantity'))['total'] or 0
-                valuation = total_quantity * float(product.cost_price or 0)
-                
-                # Determine stock status safely
-                status = 'normal'
-                if total_quantity == 0:
-                    status = 'out_of_stock'
-                    out_of_stock_count += 1
-                elif total_quantity <= (product.reorder_level or 0):
-                    status = 'low_stock'
-                    low_stock_count += 1
-                elif total_quantity > ((product.reorder_level or 0) * 3):
-                    status = 'excess_stock'
-                    excess_stock_count += 1
-                
-                # Apply stock status filter
-                if stock_status != 'all':
-                    if stock_status == 'low' and status != 'low_stock':
-                        continue
-                    elif stock_status == 'out' and status != 'out_of_stock':
-                        continue
-                    elif stock_status == 'excess' and status != 'excess_stock':
-                        continue
-                    elif stock_status == 'normal' and status != 'normal':
-                        continue
-                
-                inventory_data.append({
-                    'product': product,
-                    'total_quantity': total_quantity,
-                    'valuation': valuation,
-                    'status': status,
-                    'reorder_level': product.reorder_level or 0,
-                    'stocks': stocks,
-                })
-                
-                total_valuation += valuation
-                total_items += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing product {product.id} in inventory valuation: {str(e)}")
+            status_counts[product.status] += 1
+            
+            # Apply stock status filter
+            if stock_status in status_filters and status_filters[stock_status] != product.status:
                 continue
+            
+            valuation = float(product.valuation or 0)
+            inventory_data.append({
+                'product': product,
+                'total_quantity': product.total_quantity,
+                'valuation': valuation,
+                'status': product.status,
+                'reorder_level': product.reorder_level or 0,
+            })
+            
+            total_valuation += valuation
+            total_items += 1
+        
+        low_stock_count = status_counts['low_stock']
+        out_of_stock_count = status_counts['out_of_stock']
+        excess_stock_count = status_counts['excess_stock']
         
         # Safe sorting
         inventory_data.sort(key=lambda x: x['valuation'], reverse=True)
@@ -88,6 +88,7 @@ MIDDLEWARE = [
     'axes.middleware.AxesMiddleware',
 
     'core.middleware.SessionErrorMiddleware',
+    'core.middleware.LocationContextMiddleware',
     'core.middleware.LocationAccessMiddleware',
 ]
 
@@ -137,11 +137,11 @@ class Customer(models.Model):
 
     
 class Payment(models.Model):
-    PAYMENT_METHODS = [
+    PAYMENT_METHODS = (
         ('cash', 'Cash'),
         ('bank', 'Bank'),
         ('mobile', 'Mobile Money')
-    ]
+    )
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     method = models.CharField(max_length=20, choices=PAYMENT_METHODS)
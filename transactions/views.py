@@ -22,8 +22,10 @@ from datetime import datetime
 from django.db.models import Q, Sum
 from django.utils import timezone
 from django.shortcuts import render
+from django.urls import reverse
 from transactions.models import Transaction
 from core.models import Location
+from core.utils import prefers_minimal_response
 
 # ==================== TRANSACTION VIEWS WITH DEBUG ====================
 
@@ -1238,6 +1240,9 @@ def quick_balance_adjustment(request, customer_id):
                 user=request.user
             )
             
+            if prefers_minimal_response(request):
+                return JsonResponse({'success': True})
+            
             return JsonResponse({
                 'success': True,
                 'new_balance': float(customer.balance),
@@ -1389,7 +1394,7 @@ def quick_supply_debt(request, customer_id):
             customer.save()
             
             # Record transaction
-            DebtTransaction.objects.create(
+            debt_transaction = DebtTransaction.objects.create(
                 customer=customer,
                 amount=amount,
                 transaction_type='supply',
@@ -1397,6 +1402,11 @@ def quick_supply_debt(request, customer_id):
                 created_by=request.user
             )
             
+            if prefers_minimal_response(request):
+                response = JsonResponse({'success': True, 'id': debt_transaction.id}, status=201)
+                response['Location'] = reverse('transactions:customer_debt_history', args=[customer.id])
+                return response
+            
             return JsonResponse({
                 'success': True,
                 'new_balance': float(customer.balance),